@@ -1,7 +1,6 @@
 import numpy as np
-from tqdm import tqdm
 
-from src.tile_coding import IHT, tiles
+from tile_coding import IHT, tiles
 
 # region Hyper-parameters
 
@@ -57,8 +56,9 @@ def get_action(free_servers, priority, value_function):
 
     # Greedy action selection: select one of the actions with the highest estimated value, that is, one of the greedy actions.
     # If there is more than one greedy action, then a selection is made among them in some arbitrary way, perhaps randomly.
-    values = [value_function.state_action_value(free_servers, priority, action) for action in list(actions.values())]
-    return np.random.choice([action_ for action_, value_ in enumerate(values) if value_ == np.max(values)])
+    values = value_function.state_action_values(free_servers, priority)
+    best_value = np.max(values)
+    return np.random.choice([action_ for action_, value_ in enumerate(values) if value_ == best_value])
 
     # endregion Body
 
@@ -105,13 +105,17 @@ class ValueFunction:
 
     # region Constructor
 
-    def __init__(self, num_of_tilings, ss_state_action_value=step_size_state_action_value, ss_average_reward=step_size_average_reward):
+    def __init__(self, num_of_tilings, ss_state_action_value=step_size_state_action_value, ss_average_reward=step_size_average_reward,
+                 tabular=False, hash_table=IHT):
         # region Summary
         """
         Constructor of ValueFunction class
         :param num_of_tilings: Number of tilings
         :param ss_state_action_value: Step-size parameter for learning state-action value (denoted as 𝛼)
         :param ss_average_reward: Step-size parameter for learning average reward (denoted as 𝛽)
+        :param tabular: If True, compute the active tiles of every (free servers, priority, action) once here,
+                        so every lookup is an array index instead of tile coding and hashing
+        :param hash_table: Factory of the hash table from the maximum number of indices: IHT, ArrayIHT, or int for hash-only mode
         """
         # endregion Summary
 
@@ -127,8 +131,8 @@ class ValueFunction:
         # The maximum number of indices
         self.max_size = 2048
 
-        # Hash table
-        self.hash_table = IHT(self.max_size)
+        # Hash table (or the size of the index range in hash-only mode)
+        self.hash_table = hash_table(self.max_size)
 
         # Weight for each tile
         self.weights = np.zeros(self.max_size)
@@ -140,6 +144,14 @@ class ValueFunction:
         # Initialize average reward with 0
         self.average_reward = 0.0
 
+        # Active tiles of every state and action, shape (number of servers + 1, number of priorities, number of actions, number of tilings).
+        # The state space is small, so all of its tiles fit in the hash table and their indices never change.
+        self.tile_table = None
+        if tabular:
+            self.tile_table = np.array([[[self.get_active_tiles(free_servers, priority, action) for action in actions.values()]
+                                         for priority in priorities]
+                                        for free_servers in range(number_of_servers + 1)])
+
         # endregion Body
 
     # endregion Constructor
@@ -159,6 +171,10 @@ class ValueFunction:
 
         # region Body
 
+        # Tabular fast path
+        if self.tile_table is not None:
+            return self.tile_table[free_servers, priority, action]
+
         active_tiles = tiles(iht_or_size=self.hash_table,
                              num_tilings=self.num_of_tilings,
                              floats=[self.server_scale * free_servers, self.priority_scale * priority],
@@ -191,6 +207,26 @@ class ValueFunction:
 
         # endregion Body
 
+    def state_action_values(self, free_servers, priority):
+        # region Summary
+        """
+        Estimate the values of given state and every action without subtracting average
+        :param free_servers: Number of free servers
+        :param priority: Customer priority
+        :return: State-action value estimates without subtracting average (in the order of actions)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Tabular fast path: 1 weight gather for both actions
+        if self.tile_table is not None:
+            return self.weights[self.tile_table[free_servers, priority]].sum(axis=1)
+
+        return [self.state_action_value(free_servers, priority, action) for action in list(actions.values())]
+
+        # endregion Body
+
     def state_value(self, free_servers, priority):
         # region Summary
         """
@@ -204,7 +240,7 @@ class ValueFunction:
         # region Body
 
         # Estimate state-action values
-        state_action_values = [self.state_action_value(free_servers, priority, action) for action in list(actions.values())]
+        state_action_values = self.state_action_values(free_servers, priority)
 
         # If no free server,
         if free_servers == 0:
@@ -249,6 +285,11 @@ class ValueFunction:
         # Calculate new update size
         update_size *= self.ss_state_action_value
 
+        # Tabular fast path: the tiles of 1 state and action are distinct, so they're updated at once
+        if self.tile_table is not None:
+            self.weights[active_tiles] += update_size
+            return
+
         # For every active tile
         for active_tile in active_tiles:
             # update active tile's weight
@@ -258,16 +299,127 @@ class ValueFunction:
 
     # endregion Functions
 
+
+class ProgressHook:
+    # region Summary
+    """
+    Hook for differential_semi_gradient_sarsa that shows a progress bar.
+    tqdm is imported on the first call, so it's needed only if this hook is used.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, **tqdm_arguments):
+        # region Summary
+        """
+        Constructor of ProgressHook class
+        :param tqdm_arguments: Keyword arguments of tqdm (e.g. desc)
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.tqdm_arguments = tqdm_arguments
+        self.progress_bar = None
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def __call__(self, step, max_steps, value_function, visits):
+        # region Summary
+        """
+        Advance the progress bar to given step, and close it after the last one
+        :param step: Number of steps taken
+        :param max_steps: Step limit
+        :param value_function: VF being learned
+        :param visits: Number of visits of every number of free servers so far
+        """
+        # endregion Summary
+
+        # region Body
+
+        if self.progress_bar is None:
+            from tqdm import tqdm
+
+            self.progress_bar = tqdm(total=max_steps, **self.tqdm_arguments)
+
+        self.progress_bar.update(step - self.progress_bar.n)
+
+        if step == max_steps:
+            self.progress_bar.close()
+            self.progress_bar = None
+
+        # endregion Body
+
+    # endregion Functions
+
+
+class AverageRewardTrace:
+    # region Summary
+    """
+    Hook for differential_semi_gradient_sarsa that records the average reward estimate (denoted as 𝑅̄) over time
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self):
+        # region Summary
+        """
+        Constructor of AverageRewardTrace class
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Steps at which the hook was called, and the average reward estimate at every one of them
+        self.steps = []
+        self.average_rewards = []
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def __call__(self, step, max_steps, value_function, visits):
+        # region Summary
+        """
+        Record the average reward estimate at given step
+        :param step: Number of steps taken
+        :param max_steps: Step limit
+        :param value_function: VF being learned
+        :param visits: Number of visits of every number of free servers so far
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.steps.append(step)
+        self.average_rewards.append(value_function.average_reward)
+
+        # endregion Body
+
+    # endregion Functions
+
 # endregion Helpers
 
 # region Functions
 
-def differential_semi_gradient_sarsa(value_function, max_steps):
+def differential_semi_gradient_sarsa(value_function, max_steps, hooks=(), interval=1000):
     # region Summary
     """
     Differential semi-gradient SARSA
     :param value_function: State-value function to learn
     :param max_steps: Step limit in the continuing task
+    :param hooks: Functions of (step, max_steps, value_function, visits) called every interval steps and after the last step
+                  (e.g. ProgressHook, AverageRewardTrace), where visits is the number of visits of every number of free servers so far
+    :param interval: Number of steps between hook calls
+    :return: Frequency of every number of free servers
     """
     # endregion Summary
 
@@ -285,28 +437,35 @@ def differential_semi_gradient_sarsa(value_function, max_steps):
     # Track the hit for each number of free servers
     freq = np.zeros(number_of_servers + 1)
 
-    # For every time step
-    for _ in tqdm(range(max_steps)):
-        # increment frequency of currently free servers
-        freq[current_free_servers] += 1
+    # Steps run in blocks of interval steps with the hooks called in between, so the inner loop has no hook checks
+    for block_start in range(0, max_steps, interval):
+        block_end = min(block_start + interval, max_steps)
+
+        # For every time step
+        for _ in range(block_start, block_end):
+            # increment frequency of currently free servers
+            freq[current_free_servers] += 1
+
+            # take an action at current state
+            new_free_servers, new_priority, reward = take_action(current_free_servers, current_priority, current_action)
 
-        # take an action at current state
-        new_free_servers, new_priority, reward = take_action(current_free_servers, current_priority, current_action)
+            # get a new action
+            new_action = get_action(new_free_servers, new_priority, value_function)
 
-        # get a new action
-        new_action = get_action(new_free_servers, new_priority, value_function)
+            # learn VF with given sequence
+            value_function.learn(current_free_servers, current_priority, current_action, new_free_servers, new_priority, new_action, reward)
 
-        # learn VF with given sequence
-        value_function.learn(current_free_servers, current_priority, current_action, new_free_servers, new_priority, new_action, reward)
+            # move to the next state
+            current_free_servers = new_free_servers
+            current_priority = new_priority
 
-        # move to the next state
-        current_free_servers = new_free_servers
-        current_priority = new_priority
+            # move to the next action
+            current_action = new_action
 
-        # move to the next action
-        current_action = new_action
+        for hook in hooks:
+            hook(block_end, max_steps, value_function, freq)
 
-    print(f"Frequency of number of servers: {freq / max_steps}")
+    return freq / max_steps
 
     # endregion Body
 
@@ -0,0 +1,189 @@
+import numpy as np
+
+from src.access_control import actions, number_of_servers, probability_free, rewards
+
+# region Helpers
+
+class ServerPoolBatch:
+    # region Summary
+    """
+    N independent server pools of the access-control task stepped together with array operations.
+    Every pool has a customer at the head of the queue; each step every pool accepts or rejects its customer,
+    busy servers are released, and a new customer arrives, with the same dynamics as take_action.
+    The number of servers, the priority distribution and the release probabilities are configurable.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, pools, servers=number_of_servers, priority_probabilities=None, priority_rewards=rewards,
+                 release_probability=probability_free, rand=np.random):
+        # region Summary
+        """
+        Constructor of ServerPoolBatch class
+        :param pools: Number of pools (denoted as N)
+        :param servers: Number of servers of every pool
+        :param priority_probabilities: Probability of every priority of an arriving customer (uniform over priorities if None)
+        :param priority_rewards: Reward for accepting a customer of every priority
+        :param release_probability: Probability that a busy server becomes free at a time step (denoted as p),
+                                    1 value for all pools or 1 value per pool
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for sampling
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.pools = pools
+        self.servers = servers
+        self.priority_rewards = np.asarray(priority_rewards, dtype=float)
+        self.rand = rand
+
+        # Uniform priorities by default, as in take_action
+        if priority_probabilities is None:
+            priority_probabilities = np.full(len(self.priority_rewards), 1 / len(self.priority_rewards))
+
+        self.priority_probabilities = np.asarray(priority_probabilities, dtype=float)
+
+        if len(self.priority_probabilities) != len(self.priority_rewards):
+            raise ValueError("priority_probabilities and priority_rewards must have 1 entry per priority")
+
+        # Cumulative probabilities, so priorities are sampled with 1 uniform number per pool
+        self.priority_cdf = np.cumsum(self.priority_probabilities)
+        self.priority_cdf /= self.priority_cdf[-1]
+
+        self.release_probability = np.broadcast_to(np.asarray(release_probability, dtype=float), (pools,))
+
+        # State of every pool
+        self.free_servers = np.zeros(pools, dtype=np.int64)
+        self.priority = np.zeros(pools, dtype=np.int64)
+
+        self.reset()
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def sample_priorities(self, count):
+        # region Summary
+        """
+        Sample priorities of arriving customers
+        :param count: Number of customers
+        :return: Priorities
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Inverse CDF sampling (min guards against rounding of the last cumulative probability)
+        return np.minimum(np.searchsorted(self.priority_cdf, self.rand.random(count), side="right"), len(self.priority_cdf) - 1)
+
+        # endregion Body
+
+    def reset(self):
+        # region Summary
+        """
+        Start every pool with all servers free and a new customer
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.free_servers[:] = self.servers
+        self.priority[:] = self.sample_priorities(self.pools)
+
+        # endregion Body
+
+    def step(self, action):
+        # region Summary
+        """
+        Take an action (reject or accept the current customer) in every pool.
+        Customers can't be accepted by pools without free servers, so they're rejected there.
+        :param action: Actions of shape (N,)
+        :return: New numbers of free servers, new priorities, rewards
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Customers are accepted only where there are free servers
+        accepted = (np.asarray(action) == actions["accept"]) & (self.free_servers > 0)
+
+        # Calculate rewards based on customer priorities
+        reward = np.where(accepted, self.priority_rewards[self.priority], 0.0)
+
+        # Accepted customers occupy 1 free server
+        self.free_servers -= accepted
+
+        # Some busy servers may become free
+        self.free_servers += self.rand.binomial(self.servers - self.free_servers, self.release_probability)
+
+        # New customers arrive
+        self.priority = self.sample_priorities(self.pools)
+
+        return self.free_servers.copy(), self.priority.copy(), reward
+
+        # endregion Body
+
+    # endregion Functions
+
+# endregion Helpers
+
+# region Functions
+
+def threshold_policy(thresholds, servers=number_of_servers):
+    # region Summary
+    """
+    Get the policy that accepts a customer only if the number of free servers is above the threshold of its priority
+    :param thresholds: Minimal number of free servers to accept a customer of every priority (a customer is accepted if free servers > threshold)
+    :param servers: Number of servers
+    :return: Policy table of shape (servers + 1, number of priorities) with an action for every state
+    """
+    # endregion Summary
+
+    # region Body
+
+    free_servers = np.arange(servers + 1)[:, None]
+
+    return np.where(free_servers > np.asarray(thresholds)[None, :], actions["accept"], actions["reject"])
+
+    # endregion Body
+
+def evaluate_policy(policy, simulator, steps, warm_up=0):
+    # region Summary
+    """
+    Run a fixed admission policy in every pool of a simulator and measure its average reward
+    :param policy: Policy table of shape (servers + 1, number of priorities) with an action for every state,
+                   or a function of (free servers, priorities) arrays that returns actions
+    :param simulator: ServerPoolBatch
+    :param steps: Number of measured time steps
+    :param warm_up: Number of time steps before measuring, so the pools get close to their stationary distribution
+    :return: Average reward of every pool, and the frequency of every number of free servers over all pools and measured steps
+    """
+    # endregion Summary
+
+    # region Body
+
+    get_actions = policy if callable(policy) else lambda free_servers, priority: np.asarray(policy)[free_servers, priority]
+
+    total_rewards = np.zeros(simulator.pools)
+    free_servers_counts = np.zeros(simulator.servers + 1, dtype=np.int64)
+
+    for time_step in range(warm_up + steps):
+        measured = time_step >= warm_up
+
+        # Track the hit for each number of free servers
+        if measured:
+            free_servers_counts += np.bincount(simulator.free_servers, minlength=simulator.servers + 1)
+
+        _, _, reward = simulator.step(get_actions(simulator.free_servers, simulator.priority))
+
+        if measured:
+            total_rewards += reward
+
+    return total_rewards / steps, free_servers_counts / (steps * simulator.pools)
+
+    # endregion Body
+
+# endregion Functions
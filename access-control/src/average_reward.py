@@ -0,0 +1,212 @@
+import numpy as np
+
+from src.access_control import actions, number_of_servers, probability_free, rewards
+
+# region Helpers
+
+def release_matrix(servers=number_of_servers, release_probability=probability_free):
+    # region Summary
+    """
+    Get the distribution of the number of free servers after the busy servers are released, for every number of free servers before it.
+    Each of the servers - g busy servers becomes free with probability p, so the number of released servers is Binomial(servers - g, p).
+    Probabilities are computed from log-factorials, so the matrix is exact and stable for hundreds of servers.
+    :param servers: Number of servers
+    :param release_probability: Probability that a busy server becomes free at a time step (denoted as p)
+    :return: Matrix of shape (servers + 1, servers + 1), entry [g, f] is the probability of f free servers after g free servers
+    """
+    # endregion Summary
+
+    # region Body
+
+    if not 0 < release_probability < 1:
+        raise ValueError("release_probability must be in (0, 1)")
+
+    # log(k!) for k = 0, ..., servers
+    log_factorials = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, servers + 1)))))
+
+    free_before = np.arange(servers + 1)[:, None]
+    free_after = np.arange(servers + 1)[None, :]
+
+    # Number of busy servers (n) and number of released servers (k) of every entry
+    busy = servers - free_before
+    released = free_after - free_before
+    possible = released >= 0
+
+    # Clip impossible entries into range, they're masked afterwards
+    released = np.where(possible, released, 0)
+
+    log_probabilities = (log_factorials[busy] - log_factorials[released] - log_factorials[busy - released]
+                         + released * np.log(release_probability) + (busy - released) * np.log1p(-release_probability))
+
+    return np.where(possible, np.exp(log_probabilities), 0.0)
+
+    # endregion Body
+
+def state_action_values(values, release, priority_rewards):
+    # region Summary
+    """
+    Get the state-action values for given differential values of the numbers of free servers
+    :param values: Differential value of every number of free servers before a customer's priority is known (denoted as 𝑣),
+                   with the average reward already subtracted
+    :param release: Release matrix (see release_matrix)
+    :param priority_rewards: Reward for accepting a customer of every priority
+    :return: State-action values of shape (servers + 1, number of priorities, number of actions) without subtracting the average reward,
+             -inf for accepting without free servers
+    """
+    # endregion Summary
+
+    # region Body
+
+    servers = len(values) - 1
+
+    # Expected value of the next state after g free servers are left
+    expected_values = release @ values
+
+    q_values = np.full((servers + 1, len(priority_rewards), len(actions)), -np.inf)
+
+    # Rejecting leaves every server as it is
+    q_values[:, :, actions["reject"]] = expected_values[:, None]
+
+    # Accepting earns the priority's reward and occupies 1 free server
+    q_values[1:, :, actions["accept"]] = priority_rewards[None, :] + expected_values[:-1, None]
+
+    return q_values
+
+    # endregion Body
+
+def model_arrays(servers, priority_probabilities, priority_rewards, release_probability):
+    # region Summary
+    """
+    Get the release matrix and the priority distribution and rewards as arrays
+    :param servers: Number of servers
+    :param priority_probabilities: Probability of every priority (uniform if None)
+    :param priority_rewards: Reward for accepting a customer of every priority
+    :param release_probability: Probability that a busy server becomes free at a time step
+    :return: Release matrix, priority probabilities, priority rewards
+    """
+    # endregion Summary
+
+    # region Body
+
+    priority_rewards = np.asarray(priority_rewards, dtype=float)
+
+    if priority_probabilities is None:
+        priority_probabilities = np.full(len(priority_rewards), 1 / len(priority_rewards))
+
+    priority_probabilities = np.asarray(priority_probabilities, dtype=float)
+
+    return release_matrix(servers, release_probability), priority_probabilities / priority_probabilities.sum(), priority_rewards
+
+    # endregion Body
+
+# endregion Helpers
+
+# region Functions
+
+def relative_value_iteration(servers=number_of_servers, priority_probabilities=None, priority_rewards=rewards,
+                             release_probability=probability_free, tolerance=1e-10, max_iterations=100000):
+    # region Summary
+    """
+    Solve the access-control MDP for the optimal average reward with relative value iteration.
+    The customer's priority doesn't depend on the past, so only the values of the numbers of free servers are iterated (denoted as 𝑣),
+    each one averaged over the priority of the next customer; differential values are relative to all servers being free.
+    :param servers: Number of servers
+    :param priority_probabilities: Probability of every priority of an arriving customer (uniform if None)
+    :param priority_rewards: Reward for accepting a customer of every priority
+    :param release_probability: Probability that a busy server becomes free at a time step (denoted as p)
+    :param tolerance: Stop when the span of the change of 𝑣 is at most tolerance
+    :param max_iterations: The maximum number of iterations
+    :return: Differential state-action values of shape (servers + 1, number of priorities, number of actions) (-inf for accepting
+             without free servers), the optimal average reward (denoted as 𝑟(𝜋*)), and the optimal policy of shape (servers + 1, number of priorities)
+    """
+    # endregion Summary
+
+    # region Body
+
+    release, priority_probabilities, priority_rewards = model_arrays(servers, priority_probabilities, priority_rewards, release_probability)
+
+    values = np.zeros(servers + 1)
+    average_reward = 0.0
+
+    for _ in range(max_iterations):
+        # Bellman optimality backup averaged over the next customer's priority
+        new_values = priority_probabilities @ state_action_values(values, release, priority_rewards).max(axis=2).T
+
+        # The average reward lies between the smallest and the largest change
+        change = new_values - values
+        average_reward = new_values[servers] - values[servers]
+
+        # Keep the values relative to all servers being free, so they stay bounded
+        values = new_values - new_values[servers]
+
+        if np.ptp(change) <= tolerance:
+            break
+
+    q_values = state_action_values(values, release, priority_rewards) - average_reward
+
+    return q_values, average_reward, np.argmax(q_values, axis=2)
+
+    # endregion Body
+
+def policy_iteration(servers=number_of_servers, priority_probabilities=None, priority_rewards=rewards,
+                     release_probability=probability_free, policy=None, max_iterations=1000):
+    # region Summary
+    """
+    Solve the access-control MDP for the optimal average reward with policy iteration.
+    Every evaluation solves the linear system 𝑣 = 𝑟̄ - 𝑟(𝜋) + 𝑃𝑣 of the number of free servers with 𝑣 = 0 when all servers are free,
+    and every improvement keeps the current action unless another one is strictly better, so the iteration ends.
+    :param servers: Number of servers
+    :param priority_probabilities: Probability of every priority of an arriving customer (uniform if None)
+    :param priority_rewards: Reward for accepting a customer of every priority
+    :param release_probability: Probability that a busy server becomes free at a time step (denoted as p)
+    :param policy: Initial policy of shape (servers + 1, number of priorities) (accept whenever possible if None)
+    :param max_iterations: The maximum number of iterations
+    :return: Differential state-action values of shape (servers + 1, number of priorities, number of actions) (-inf for accepting
+             without free servers), the optimal average reward (denoted as 𝑟(𝜋*)), and the optimal policy of shape (servers + 1, number of priorities)
+    """
+    # endregion Summary
+
+    # region Body
+
+    release, priority_probabilities, priority_rewards = model_arrays(servers, priority_probabilities, priority_rewards, release_probability)
+
+    free_servers = np.arange(servers + 1)
+
+    if policy is None:
+        policy = np.full((servers + 1, len(priority_rewards)), actions["accept"])
+
+    # Customers can't be accepted without free servers
+    policy = np.array(policy)
+    policy[0] = actions["reject"]
+
+    for _ in range(max_iterations):
+        # Number of free servers left after every state's action, and the expected reward and transitions of every number of free servers
+        accepted = policy == actions["accept"]
+        expected_reward = (accepted * priority_rewards[None, :]) @ priority_probabilities
+        transitions = np.einsum("p,fpg->fg", priority_probabilities, release[free_servers[:, None] - accepted])
+
+        # Solve (I - P)𝑣 + 𝑟(𝜋) = 𝑟̄ with 𝑣 = 0 when all servers are free: the average reward takes the place of that value
+        system = np.eye(servers + 1) - transitions
+        system[:, servers] = 1.0
+        solution = np.linalg.solve(system, expected_reward)
+
+        average_reward = solution[servers]
+        values = solution.copy()
+        values[servers] = 0.0
+
+        q_values = state_action_values(values, release, priority_rewards) - average_reward
+
+        # Greedy improvement that keeps the current action on ties
+        current = np.take_along_axis(q_values, policy[:, :, None], axis=2)[:, :, 0]
+        improved = q_values.max(axis=2) > current + 1e-9 * np.maximum(1.0, np.abs(current))
+
+        if not np.any(improved):
+            break
+
+        policy = np.where(improved, np.argmax(q_values, axis=2), policy)
+
+    return q_values, average_reward, policy
+
+    # endregion Body
+
+# endregion Functions
@@ -1,7 +1,7 @@
 import numpy as np
 from tqdm import tqdm
 
-from src.models import TrivialModel, TimeModel
+from src.models import ArrayModel, ArrayTimeModel
 
 def choose_action(state, action_value_estimates, maze, dyna_params):
     # region Summary
@@ -127,7 +127,7 @@ def changing_maze(maze, dyna_params):
     for run in tqdm(range(dyna_params.runs)):
 
         # set up models
-        models = [TrivialModel(), TimeModel(maze, time_weight=dyna_params.time_weight)]
+        models = [ArrayModel(maze), ArrayTimeModel(maze, time_weight=dyna_params.time_weight)]
 
         # initialize state-action value estimates with 0s
         action_value_estimates = [np.zeros(maze.action_value_estimates_size), np.zeros(maze.action_value_estimates_size)]
@@ -210,6 +210,234 @@ class TimeModel:
 
     # endregion Functions
 
+class ArrayModel:
+    # region Summary
+    """
+    Trivial model for planning in Dyna-Q, stored in dense (height, width, actions) arrays instead of nested dicts.
+    Observed states are kept in an index array, and the observed actions of every state in the order they were first tried,
+    so sampling a state and then one of its actions takes O(1) time and draws the same random numbers as TrivialModel.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, maze, rand=np.random):
+        # region Summary
+        """
+        Constructor of ArrayModel class
+        :param maze: The maze instance, for the shape of the state-action space
+        :param rand: An instance of np.random.RandomState for sampling
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.maze = maze
+        self.rand = rand
+
+        height, width, actions_number = maze.action_value_estimates_size
+
+        # Next state (row and column) and reward of every state and action
+        self.next_states = np.zeros((height, width, actions_number, 2), dtype=np.int64)
+        self.rewards = np.zeros((height, width, actions_number))
+
+        # Observed states in the order they were first fed, the first states_number rows are in use
+        self.states = np.zeros((height * width, 2), dtype=np.int64)
+        self.states_number = 0
+
+        # Observed actions of every state in the order they were first fed, the first actions_numbers[state] are in use
+        self.actions = np.zeros((height, width, actions_number), dtype=np.int64)
+        self.actions_numbers = np.zeros((height, width), dtype=np.int64)
+
+        # Whether every state and action has been observed
+        self.observed = np.zeros((height, width, actions_number), dtype=bool)
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def add(self, state, action):
+        # region Summary
+        """
+        Add a state and action to the observed ones, if it's new
+        :param state: State
+        :param action: Action
+        """
+        # endregion Summary
+
+        # region Body
+
+        row, column = state
+
+        # The state and action is already observed
+        if self.observed[row, column, action]:
+            return
+
+        # If the current state is new to the model, add it to the observed states
+        if self.actions_numbers[row, column] == 0:
+            self.states[self.states_number] = state
+            self.states_number += 1
+
+        # Add the action to the observed actions of the state
+        self.actions[row, column, self.actions_numbers[row, column]] = action
+        self.actions_numbers[row, column] += 1
+        self.observed[row, column, action] = True
+
+        # endregion Body
+
+    def feed(self, state, action, next_state, reward):
+        # region Summary
+        """
+        Feed the model with previous experience
+        :param state: Current state
+        :param action: Action
+        :param next_state: Next state
+        :param reward: Reward
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.add(state, action)
+
+        # Set the next state and reward as model's value for current state and action
+        self.next_states[state[0], state[1], action] = next_state
+        self.rewards[state[0], state[1], action] = reward
+
+        # endregion Body
+
+    def sample_state_action(self):
+        # region Summary
+        """
+        Randomly sample an observed state, then one of its observed actions
+        :return: Row, column, action
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Get the state by state index
+        row, column = self.states[self.rand.randint(0, self.states_number)]
+
+        # Get the action by action index
+        action = self.actions[row, column, self.rand.randint(0, self.actions_numbers[row, column])]
+
+        return row, column, action
+
+        # endregion Body
+
+    def sample(self):
+        # region Summary
+        """
+        Randomly sample from previous experience
+        :return: Current state, action, next state, reward
+        """
+        # endregion Summary
+
+        # region Body
+
+        row, column, action = self.sample_state_action()
+
+        return (row, column), action, self.next_states[row, column, action], self.rewards[row, column, action]
+
+        # endregion Body
+
+    # endregion Functions
+
+class ArrayTimeModel(ArrayModel):
+    # region Summary
+    """
+    Time-based model for planning in Dyna-Q+, stored in dense arrays like ArrayModel (see TimeModel)
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, maze, time_weight=1e-4, rand=np.random):
+        # region Summary
+        """
+        Constructor of ArrayTimeModel class
+        :param maze: The maze instance, for the actions and the shape of the state-action space
+        :param time_weight: The weight for elapsed time in sampling reward (denoted as κ (kappa), it needs to be small)
+        :param rand: An instance of np.random.RandomState for sampling
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Base class constructor call
+        ArrayModel.__init__(self, maze, rand)
+
+        self.time_weight = time_weight
+
+        # Time of the last visit of every state and action
+        self.times = np.zeros(self.rewards.shape, dtype=np.int64)
+
+        # Track the total time
+        self.time = 0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def feed(self, state, action, next_state, reward):
+        # region Summary
+        """
+        Feed the model with previous experience
+        :param state: Current State
+        :param action: Action
+        :param next_state: Next state
+        :param reward: Reward
+        """
+        # endregion Summary
+
+        # region Body
+
+        row, column = state
+
+        # Increment time
+        self.time += 1
+
+        # If the current state is new to the model
+        if self.actions_numbers[row, column] == 0:
+            # Actions that had never been tried before from a state were allowed to be considered in the planning step
+            for action_ in self.maze.actions.values():
+                if action_ != action:
+                    # Such actions would lead back to the same state with a reward of 0․ Notice that the minimum time stamp is 1 instead of 0
+                    ArrayModel.feed(self, state, action_, state, 0)
+                    self.times[row, column, action_] = 1
+
+        # Set the next state, reward and time as model's value for current state and action
+        ArrayModel.feed(self, state, action, next_state, reward)
+        self.times[row, column, action] = self.time
+
+        # endregion Body
+
+    def sample(self):
+        # region Summary
+        """
+        Randomly sample from previous experience
+        :return: Current state, action, next state, reward
+        """
+        # endregion Summary
+
+        # region Body
+
+        row, column, action = self.sample_state_action()
+
+        # Adjust reward with elapsed time since last visit
+        reward = self.rewards[row, column, action] + self.time_weight * np.sqrt(self.time - self.times[row, column, action])
+
+        return (row, column), action, self.next_states[row, column, action], reward
+
+        # endregion Body
+
+    # endregion Functions
+
 class PriorityQueue:
     # region Constructor
 
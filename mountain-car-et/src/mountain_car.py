@@ -1,6 +1,8 @@
 import numpy as np
 
-from src.tile_coding import IHT, tiles
+from tile_coding import IHT, hash_coords, tiles
+
+from src.sparse_trace import SparseTrace
 
 # region Hyper-parameters
 
@@ -59,6 +61,22 @@ def step(position, velocity, action):
 
     # endregion Body
 
+def action_index(action):
+    # region Summary
+    """
+    Get the index of given action in actions (the row of its tiles in get_all_active_tiles)
+    :param action: Action
+    :return: Index of the action
+    """
+    # endregion Summary
+
+    # region Body
+
+    # Actions are -1, 0, 1 in order
+    return action + 1
+
+    # endregion Body
+
 def get_action(position, velocity, value_function):
     # region Summary
     """
@@ -78,15 +96,35 @@ def get_action(position, velocity, value_function):
 
     # Greedy action selection: select one of the actions with the highest estimated value, that is, one of the greedy actions.
     # If there is more than one greedy action, then a selection is made among them in some arbitrary way, perhaps randomly.
-    values = []
-    for action in list(actions.values()):
-        values.append(value_function.value(position, velocity, action))
+    values = value_function.values_for_all_actions(position, velocity)
     return np.argmax(values) - 1
 
     # endregion Body
 
 # region Eligibility Traces
 
+def requires(*inputs):
+    # region Summary
+    """
+    Declare the inputs an ET update rule needs besides the trace, the active tiles and the trace-decay parameter.
+    SARSA passes every declared input as a keyword argument of the same name, so any function
+    rule(trace, active_tiles, trace_decay, **inputs) decorated with the inputs it needs can be used as a trace type.
+    :param inputs: Names of the inputs (from SARSA.trace_inputs: "step_size", "clearing_tiles")
+    :return: Decorator that records the inputs as the rule's inputs attribute
+    """
+    # endregion Summary
+
+    # region Body
+
+    def declare(trace_update):
+        trace_update.inputs = inputs
+        return trace_update
+
+    return declare
+
+    # endregion Body
+
+@requires()
 def accumulating_trace(trace, active_tiles, trace_decay):
     # region Summary
     """
@@ -108,6 +146,7 @@ def accumulating_trace(trace, active_tiles, trace_decay):
 
     # endregion Body
 
+@requires("step_size")
 def dutch_trace(trace, active_tiles, trace_decay, step_size):
     # region Summary
     """
@@ -133,6 +172,7 @@ def dutch_trace(trace, active_tiles, trace_decay, step_size):
 
     # endregion Body
 
+@requires()
 def replacing_trace(trace, active_tiles, trace_decay):
     # region Summary
     """
@@ -146,19 +186,18 @@ def replacing_trace(trace, active_tiles, trace_decay):
 
     # region Body
 
-    # The replacing trace is defined on a component-by-component basis depending on whether the component of the feature vector was:
-    active = np.isin(np.arange(len(trace)), active_tiles)
-
-    # a. active (= 1),
-    trace[active] = 1
+    # The replacing trace is defined on a component-by-component basis depending on whether the component of the feature vector was
+    # a. inactive (= 0): decayed (active components are decayed too, but then overwritten, which avoids building a mask of the whole trace),
+    trace *= discount * trace_decay
 
-    # b. inactive (= 0)
-    trace[~active] *= discount * trace_decay
+    # b. active (= 1): set to 1
+    trace[active_tiles] = 1
 
     return trace
 
     # endregion Body
 
+@requires("clearing_tiles")
 def replacing_trace_with_clearing(trace, active_tiles, trace_decay, clearing_tiles):
     # region Summary
     """
@@ -173,17 +212,15 @@ def replacing_trace_with_clearing(trace, active_tiles, trace_decay, clearing_til
 
     # region Body
 
-    # The replacing trace is defined on a component-by-component basis depending on whether the component of the feature vector was:
-    active = np.isin(np.arange(len(trace)), active_tiles)
-
-    # a. inactive (= 0),
-    trace[~active] *= discount * trace_decay
+    # The replacing trace is defined on a component-by-component basis depending on whether the component of the feature vector was
+    # a. inactive (= 0): decayed (active components are decayed too, but then overwritten, which avoids building a mask of the whole trace),
+    trace *= discount * trace_decay
 
-    # b. to be cleared,
+    # b. to be cleared: set to 0,
     trace[clearing_tiles] = 0
 
-    # c. active (= 1)
-    trace[active] = 1
+    # c. active (= 1): set to 1
+    trace[active_tiles] = 1
 
     return trace
 
@@ -203,17 +240,31 @@ class SARSA:
     """
     # endregion Summary
 
+    # region Constants
+
+    # Inputs SARSA can pass to an ET update rule (see requires)
+    trace_inputs = ("step_size", "clearing_tiles")
+
+    # Number of states whose active tiles are cached: play evaluates the next state before learning with the current one
+    tile_cache_size = 2
+
+    # endregion Constants
+
     # region Constructor
 
-    def __init__(self, step_size, trace_decay, trace_update=accumulating_trace, num_of_tilings=8, max_size=2048):
+    def __init__(self, step_size, trace_decay, trace_update=accumulating_trace, num_of_tilings=8, max_size=2048, trace_cutoff=None,
+                 hash_table=IHT):
         # region Summary
         """
         Constructor of SARSA class
         :param step_size: Step-size parameter (denoted as 𝛼)
         :param trace_decay: Trace-decay parameter (denoted as 𝜆)
-        :param trace_update: Eligibility trace type (accumulating, Dutch, replacing)
+        :param trace_update: Eligibility trace type (accumulating, Dutch, replacing, or any rule decorated with requires)
         :param num_of_tilings: Number of tilings
         :param max_size: The maximum number of indices
+        :param trace_cutoff: If not None, keep the trace sparse (SparseTrace) and drop entries with a magnitude of at most trace_cutoff,
+                             so the cost of a step depends on the number of recently active tiles instead of max_size
+        :param hash_table: Factory of the hash table from the maximum number of indices: IHT, ArrayIHT, or int for hash-only mode
         """
         # endregion Summary
 
@@ -227,14 +278,22 @@ class SARSA:
         self.num_of_tilings = num_of_tilings
         self.max_size = max_size
 
-        # Hash table
-        self.hash_table = IHT(max_size)
+        # Hash table (or the size of the index range in hash-only mode)
+        self.hash_table = hash_table(max_size)
 
         # Weight for each tile
         self.weights = np.zeros(max_size)
 
         # Trace for each tile
-        self.trace = np.zeros(max_size)
+        self.trace = np.zeros(max_size) if trace_cutoff is None else SparseTrace(max_size, trace_cutoff)
+
+        # Inputs the ET update rule declared
+        unknown_inputs = set(getattr(trace_update, "inputs", ())) - set(self.trace_inputs)
+        if unknown_inputs:
+            raise ValueError(f"Unexpected trace inputs {sorted(unknown_inputs)}, expected some of {self.trace_inputs}")
+
+        # Active tiles of every action for the last tile_cache_size states, keyed by (position, velocity)
+        self.tile_cache = {}
 
         # State features (position and velocity) need scaling to satisfy the tile software
         self.position_scale = self.num_of_tilings / (POSITION["max"] - POSITION["min"])
@@ -270,6 +329,41 @@ class SARSA:
 
         # endregion Body
 
+    def get_all_active_tiles(self, position, velocity):
+        # region Summary
+        """
+        Get indices of active tiles for given state and every action in 1 pass: the tile coordinates of the state are computed once
+        and every action is appended to them. Tiles are looked up action by action, in the same order as calling get_active_tiles
+        for every action, so the hash table assigns the same indices.
+        The tiles of the last tile_cache_size states are cached (a tile's index never changes once it's assigned),
+        so value and learn reuse the tiles get_action computed instead of hashing the state again.
+        :param position: Current position
+        :param velocity: Current velocity
+        :return: Active tiles of every action, shape (number of actions, number of tilings)
+        """
+        # endregion Summary
+
+        # region Body
+
+        state = (position, velocity)
+
+        if state not in self.tile_cache:
+            # Coordinates of every tiling without the action (no hash table, so nothing is inserted)
+            coordinates = tiles(iht_or_size=None,
+                                num_tilings=self.num_of_tilings,
+                                floats=[self.position_scale * position, self.velocity_scale * velocity])
+
+            # Drop the least recently cached state (dicts keep insertion order)
+            if len(self.tile_cache) >= self.tile_cache_size:
+                del self.tile_cache[next(iter(self.tile_cache))]
+
+            self.tile_cache[state] = np.array([[hash_coords((*coordinate, action), self.hash_table) for coordinate in coordinates]
+                                               for action in actions.values()])
+
+        return self.tile_cache[state]
+
+        # endregion Body
+
     def value(self, position, velocity, action):
         # region Summary
         """
@@ -289,8 +383,8 @@ class SARSA:
             value_estimate = 0.0
 
         else:
-            # Get indices of active tiles for given state and action
-            active_tiles = self.get_active_tiles(position, velocity, action)
+            # Get indices of active tiles for given state and action (cached by get_action)
+            active_tiles = self.get_all_active_tiles(position, velocity)[action_index(action)]
 
             # Calculate value estimate
             value_estimate = np.sum(self.weights[active_tiles])
@@ -299,6 +393,27 @@ class SARSA:
 
         # endregion Body
 
+    def values_for_all_actions(self, position, velocity):
+        # region Summary
+        """
+        Estimate the values of given state and every action with 1 tile pass and 1 weight gather
+        :param position: Current position
+        :param velocity: Current velocity
+        :return: Value estimates of every action (in the order of actions)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # When position reached the right bound,
+        if position == POSITION["max"]:
+            # the goal was reached and the episode was terminated
+            return np.zeros(len(actions))
+
+        return np.take(self.weights, self.get_all_active_tiles(position, velocity)).sum(axis=1)
+
+        # endregion Body
+
     def learn(self, position, velocity, action, target):
         # region Summary
         """
@@ -312,8 +427,9 @@ class SARSA:
 
         # region Body
 
-        # Get indices of active tiles for given state and action
-        active_tiles = self.get_active_tiles(position, velocity, action)
+        # Get indices of active tiles for given state and every action (cached by get_action), and of the given action
+        all_active_tiles = self.get_all_active_tiles(position, velocity)
+        active_tiles = all_active_tiles[action_index(action)]
 
         # Calculate value estimate
         value_estimation = np.sum(self.weights[active_tiles])
@@ -321,36 +437,35 @@ class SARSA:
         # Calculate TD error (denoted as 𝛿)
         TD_error = target - value_estimation
 
-        # If ET is accumulating or replacing
-        if self.trace_update == accumulating_trace or self.trace_update == replacing_trace:
-            # update ET according to the corresponding rule
-            self.trace_update(self.trace, active_tiles, self.trace_decay)
+        # Inputs an ET update rule can declare, each computed only if the rule needs it
+        inputs = dict(step_size=lambda: self.step_size,
+                      # active tiles of the actions that weren't selected
+                      clearing_tiles=lambda: np.delete(all_active_tiles, action_index(action), axis=0).ravel())
 
-        # If ET is Dutch
-        elif self.trace_update == dutch_trace:
-            # update ET according to the corresponding rule
-            self.trace_update(self.trace, active_tiles, self.trace_decay, self.step_size)
+        # Update ET according to the corresponding rule
+        self.trace_update(self.trace, active_tiles, self.trace_decay,
+                          **{name: inputs[name]() for name in getattr(self.trace_update, "inputs", ())})
 
-        # If ET is replacing with tiles clearing
-        elif self.trace_update == replacing_trace_with_clearing:
-            # create an empty list for clearing tiles
-            clearing_tiles = []
+        # Update weights (equation on page 303)
+        if isinstance(self.trace, SparseTrace):
+            # only the stored entries of a sparse trace change weights, then the decayed ones are dropped
+            self.trace.add_to(self.weights, self.step_size * TD_error)
+            self.trace.prune()
+        else:
+            self.weights += self.step_size * TD_error * self.trace
 
-            # for every action
-            for act in list(actions.values()):
-                # if action wasn't selected
-                if act != action:
-                    # extend the list of clearing tiles with active tiles
-                    clearing_tiles.extend(self.get_active_tiles(position, velocity, act))
+        # endregion Body
 
-            # update ET according to the corresponding rule
-            self.trace_update(self.trace, active_tiles, self.trace_decay, clearing_tiles)
+    def begin_episode(self):
+        # region Summary
+        """
+        Called by play at the start of every episode. SARSA(𝜆) carries its trace over from the previous episode, so nothing is reset.
+        """
+        # endregion Summary
 
-        else:
-            raise Exception("Unexpected Trace Type")
+        # region Body
 
-        # Update weights (equation on page 303)
-        self.weights += self.step_size * TD_error * self.trace
+        pass
 
         # endregion Body
 
@@ -366,15 +481,126 @@ class SARSA:
 
         # region Body
 
-        # Create an empty list for costs
-        costs = []
+        return -np.max(self.values_for_all_actions(position, velocity))
 
-        # For every action
-        for action in list(actions.values()):
-            # append the value estimate of given state and action to the list of costs
-            costs.append(self.value(position, velocity, action))
+        # endregion Body
+
+    # endregion Functions
 
-        return -np.max(costs)
+
+class TrueOnlineSARSA(SARSA):
+    # region Summary
+    """
+    True online SARSA(𝜆) (Section 12.8) with dutch traces, using the same tile coder and play loop as SARSA.
+    Values are sparse dot products over the active tiles. play calls value() for the next state before learn(),
+    so that value is cached as 𝑄_old for the next step instead of being computed again.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, step_size, trace_decay, num_of_tilings=8, max_size=2048, trace_cutoff=None, hash_table=IHT):
+        # region Summary
+        """
+        Constructor of TrueOnlineSARSA class
+        :param step_size: Step-size parameter (denoted as 𝛼)
+        :param trace_decay: Trace-decay parameter (denoted as 𝜆)
+        :param num_of_tilings: Number of tilings
+        :param max_size: The maximum number of indices
+        :param trace_cutoff: If not None, keep the trace sparse and drop entries with a magnitude of at most trace_cutoff (see SARSA)
+        :param hash_table: Factory of the hash table from the maximum number of indices: IHT, ArrayIHT, or int for hash-only mode
+        """
+        # endregion Summary
+
+        # region Body
+
+        SARSA.__init__(self, step_size, trace_decay, dutch_trace, num_of_tilings, max_size, trace_cutoff, hash_table)
+
+        # Value of the state and action of the current step, computed before the last weight update (denoted as 𝑄_old)
+        self.old_value = 0.0
+
+        # Value returned by the last value() call, which play makes for the next state and action
+        self.last_value = 0.0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def value(self, position, velocity, action):
+        # region Summary
+        """
+        Estimate the value of given state and action, and remember it as the next 𝑄_old
+        :param position: Current position
+        :param velocity: Current velocity
+        :param action: Given action
+        :return: Value estimate
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.last_value = SARSA.value(self, position, velocity, action)
+
+        return self.last_value
+
+        # endregion Body
+
+    def learn(self, position, velocity, action, target):
+        # region Summary
+        """
+        Learn with given state, action and target (true online SARSA(𝜆) update)
+        :param position: Current position
+        :param velocity: Current velocity
+        :param action: Given action
+        :param target: Given target (𝑅 + 𝛾𝑄' where 𝑄' is the value of the next state and action)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Get indices of active tiles (the nonzero features 𝒙) for given state and action (cached by get_action)
+        active_tiles = self.get_all_active_tiles(position, velocity)[action_index(action)]
+
+        # Calculate value estimate (denoted as 𝑄 = 𝒘ᵀ𝒙)
+        value_estimation = np.sum(self.weights[active_tiles])
+
+        # Calculate TD error (denoted as 𝛿)
+        TD_error = target - value_estimation
+
+        # Update dutch trace: 𝒛 = 𝛾𝜆𝒛 + (1 - 𝛼𝛾𝜆𝒛ᵀ𝒙)𝒙
+        dutch_trace(self.trace, active_tiles, self.trace_decay, self.step_size)
+
+        # Update weights: 𝒘 += 𝛼(𝛿 + 𝑄 - 𝑄_old)𝒛 - 𝛼(𝑄 - 𝑄_old)𝒙
+        if isinstance(self.trace, SparseTrace):
+            self.trace.add_to(self.weights, self.step_size * (TD_error + value_estimation - self.old_value))
+            self.trace.prune()
+        else:
+            self.weights += self.step_size * (TD_error + value_estimation - self.old_value) * self.trace
+
+        self.weights[active_tiles] -= self.step_size * (value_estimation - self.old_value)
+
+        # The next step's 𝑄_old is 𝑄' from the value() call play made for the target
+        self.old_value = self.last_value
+
+        # endregion Body
+
+    def begin_episode(self):
+        # region Summary
+        """
+        Called by play at the start of every episode: 𝒛 = 0 and 𝑄_old = 0
+        """
+        # endregion Summary
+
+        # region Body
+
+        if isinstance(self.trace, SparseTrace):
+            self.trace.reset()
+        else:
+            self.trace[:] = 0
+
+        self.old_value = 0.0
 
         # endregion Body
 
@@ -395,6 +621,9 @@ def play(evaluator):
 
     # region Body
 
+    # Let the evaluator prepare for a new episode
+    evaluator.begin_episode()
+
     # Start at a random position around the bottom of the valley
     current_position = np.random.uniform(-0.6, -0.4)
 
@@ -0,0 +1,204 @@
+import numpy as np
+
+class SparseTrace:
+    # region Summary
+    """
+    Eligibility trace (denoted as 𝒛) that stores only its nonzero entries, as (tile, value) pairs in 2 arrays.
+    It supports the operations of the trace update rules on a dense vector (trace *= factor, trace[tiles], trace[tiles] = values),
+    so the same rules apply to both, but every operation costs O(nonzero entries) instead of O(table size).
+    Entries whose magnitude decays to the cutoff or below are dropped by prune().
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, size, cutoff=1e-4):
+        # region Summary
+        """
+        Constructor of SparseTrace class
+        :param size: Size of the dense vector (the maximum number of tile indices)
+        :param cutoff: Entries with a magnitude of at most cutoff are dropped by prune() (0 drops exact zeros only)
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.size = size
+        self.cutoff = cutoff
+
+        # Position of every tile in tiles and values, -1 for tiles with a 0 entry
+        self.slots = np.full(size, -1, dtype=np.int64)
+
+        # Nonzero entries, the first count elements are in use
+        self.tiles = np.zeros(16, dtype=np.int64)
+        self.values = np.zeros(16)
+        self.count = 0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def __len__(self):
+        return self.size
+
+    def __imul__(self, factor):
+        # region Summary
+        """
+        Multiply every entry by a factor (trace *= factor)
+        :param factor: Factor (e.g. 𝛾𝜆)
+        :return: This trace
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.values[:self.count] *= factor
+
+        return self
+
+        # endregion Body
+
+    def __getitem__(self, tiles):
+        # region Summary
+        """
+        Get entries of given tiles (trace[tiles])
+        :param tiles: Tile indices
+        :return: Entries (0 for tiles that aren't stored)
+        """
+        # endregion Summary
+
+        # region Body
+
+        slots = self.slots[tiles]
+
+        return np.where(slots >= 0, self.values[slots], 0.)
+
+        # endregion Body
+
+    def __setitem__(self, tiles, values):
+        # region Summary
+        """
+        Set entries of given tiles (trace[tiles] = values). As with NumPy arrays, the last value wins for repeated tiles.
+        :param tiles: Tile indices
+        :param values: Value or values
+        """
+        # endregion Summary
+
+        # region Body
+
+        tiles = np.asarray(tiles, dtype=np.int64)
+        slots = self.slots[tiles]
+
+        # Tiles that aren't stored yet get a slot at the end
+        new = slots < 0
+        if np.any(new):
+            new_tiles = np.unique(tiles[new])
+            self.reserve(self.count + len(new_tiles))
+
+            new_slots = np.arange(self.count, self.count + len(new_tiles))
+            self.slots[new_tiles] = new_slots
+            self.tiles[new_slots] = new_tiles
+            self.count += len(new_tiles)
+
+            slots = self.slots[tiles]
+
+        self.values[slots] = values
+
+        # endregion Body
+
+    def reserve(self, count):
+        # region Summary
+        """
+        Grow the entry arrays (doubling) to hold at least count entries
+        :param count: Number of entries
+        """
+        # endregion Summary
+
+        # region Body
+
+        if count <= len(self.tiles):
+            return
+
+        capacity = max(count, 2 * len(self.tiles))
+        self.tiles = np.resize(self.tiles, capacity)
+        self.values = np.resize(self.values, capacity)
+
+        # endregion Body
+
+    def prune(self):
+        # region Summary
+        """
+        Drop the entries with a magnitude of at most the cutoff
+        """
+        # endregion Summary
+
+        # region Body
+
+        values = self.values[:self.count]
+        keep = np.abs(values) > self.cutoff
+
+        if np.all(keep):
+            return
+
+        tiles = self.tiles[:self.count]
+        self.slots[tiles[~keep]] = -1
+
+        # Compact the kept entries to the front
+        kept = np.count_nonzero(keep)
+        self.tiles[:kept] = tiles[keep]
+        self.values[:kept] = values[keep]
+        self.count = kept
+        self.slots[self.tiles[:kept]] = np.arange(kept)
+
+        # endregion Body
+
+    def add_to(self, weights, scale):
+        # region Summary
+        """
+        Add the scaled trace to a weight vector (weights += scale * trace)
+        :param weights: Weight vector of the dense size
+        :param scale: Scale (e.g. 𝛼𝛿)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Stored tiles are unique, so fancy-index addition is safe
+        weights[self.tiles[:self.count]] += scale * self.values[:self.count]
+
+        # endregion Body
+
+    def reset(self):
+        # region Summary
+        """
+        Set every entry to 0
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.slots[self.tiles[:self.count]] = -1
+        self.count = 0
+
+        # endregion Body
+
+    def dense(self):
+        # region Summary
+        """
+        Get the trace as a dense vector
+        :return: Dense vector
+        """
+        # endregion Summary
+
+        # region Body
+
+        trace = np.zeros(self.size)
+        trace[self.tiles[:self.count]] = self.values[:self.count]
+
+        return trace
+
+        # endregion Body
+
+    # endregion Functions
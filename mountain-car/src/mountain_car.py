@@ -1,6 +1,6 @@
 import numpy as np
 
-from src.tile_coding import IHT, tiles
+from tile_coding import IHT, hash_coords, tiles, tiles_batch
 
 # region Hyper-parameters
 
@@ -39,10 +39,8 @@ def get_action(position, velocity, value_function):
 
     # Greedy action selection: select one of the actions with the highest estimated value, that is, one of the greedy actions.
     # If there is more than one greedy action, then a selection is made among them in some arbitrary way, perhaps randomly.
-    values = []
-    for action in list(all_actions.values()):
-        values.append(value_function.value(position, velocity, action))
-    return np.random.choice([action_ for action_, value_ in enumerate(values) if value_ == np.max(values)]) - 1
+    values = value_function.values_for_all_actions(position, velocity)
+    return np.random.choice(np.flatnonzero(values == np.max(values))) - 1
 
     # endregion Body
 
@@ -93,13 +91,14 @@ class ValueFunction:
 
     # region Constructor
 
-    def __init__(self, step_size, num_of_tilings=8, max_size=2048):
+    def __init__(self, step_size, num_of_tilings=8, max_size=2048, hash_table=IHT):
         # region Summary
         """
         Constructor of ValueFunction class
         :param step_size: Step-size parameter
         :param num_of_tilings: Number of tilings
         :param max_size: The maximum number of indices
+        :param hash_table: Factory of the hash table from the maximum number of indices: IHT, ArrayIHT, or int for hash-only mode
         """
         # endregion Summary
 
@@ -111,8 +110,8 @@ class ValueFunction:
         self.num_of_tilings = num_of_tilings
         self.max_size = max_size
 
-        # Hash table
-        self.hash_table = IHT(max_size)
+        # Hash table (or the size of the index range in hash-only mode)
+        self.hash_table = hash_table(max_size)
 
         # Weight for each tile
         self.weights = np.zeros(max_size)
@@ -121,6 +120,9 @@ class ValueFunction:
         self.position_scale = self.num_of_tilings / (POSITION["max"] - POSITION["min"])
         self.velocity_scale = self.num_of_tilings / (VELOCITY["max"] - VELOCITY["min"])
 
+        # Active tiles of the cost-to-go grid for every resolution, see cost_to_go_grid
+        self.grid_tiles = {}
+
         # endregion Body
 
     # endregion Constructor
@@ -151,6 +153,29 @@ class ValueFunction:
 
         # endregion Body
 
+    def get_all_active_tiles(self, position, velocity):
+        # region Summary
+        """
+        Get indices of active tiles for given state and every action in 1 pass: the tile coordinates of the state are computed once
+        and every action is appended to them. Tiles are looked up action by action, in the same order as calling get_active_tiles
+        for every action, so the hash table assigns the same indices.
+        :param position: Current position
+        :param velocity: Current velocity
+        :return: Active tiles of every action, shape (number of actions, number of tilings)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Coordinates of every tiling without the action (no hash table, so nothing is inserted)
+        coordinates = tiles(iht_or_size=None,
+                            num_tilings=self.num_of_tilings,
+                            floats=[self.position_scale * position, self.velocity_scale * velocity])
+
+        return [[hash_coords((*coordinate, action), self.hash_table) for coordinate in coordinates] for action in all_actions.values()]
+
+        # endregion Body
+
     def value(self, position, velocity, action):
         # region Summary
         """
@@ -180,6 +205,27 @@ class ValueFunction:
 
         # endregion Body
 
+    def values_for_all_actions(self, position, velocity):
+        # region Summary
+        """
+        Estimate the values of given state and every action with 1 tile pass and 1 weight gather
+        :param position: Current position
+        :param velocity: Current velocity
+        :return: Value estimates of every action (in the order of all_actions)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # When position reached the right bound,
+        if position == POSITION["max"]:
+            # the goal was reached and the episode was terminated
+            return np.zeros(len(all_actions))
+
+        return np.take(self.weights, self.get_all_active_tiles(position, velocity)).sum(axis=1)
+
+        # endregion Body
+
     def learn(self, position, velocity, action, target):
         # region Summary
         """
@@ -221,15 +267,49 @@ class ValueFunction:
 
         # region Body
 
-        # Create an empty list for costs
-        costs = []
+        return -np.max(self.values_for_all_actions(position, velocity))
 
-        # For every action
-        for action in list(all_actions.values()):
-            # append the value estimate of given state and action to the list of costs
-            costs.append(self.value(position, velocity, action))
+        # endregion Body
 
-        return -np.max(costs)
+    def cost_to_go_grid(self, resolution=40):
+        # region Summary
+        """
+        Get number of steps to reach the goal for every state of a position × velocity grid, as cost_to_go would for every grid point.
+        The active tiles of the whole grid are computed in 1 batched lookup the first time a resolution is used and then cached,
+        so later calls (e.g. snapshots during training) only gather weights. Tile indices never change once assigned,
+        so the cache stays valid while the VF learns.
+        :param resolution: Number of positions and of velocities
+        :return: Positions (resolution,), velocities (resolution,), costs of shape (resolution, resolution) indexed by [position, velocity]
+        """
+        # endregion Summary
+
+        # region Body
+
+        if resolution not in self.grid_tiles:
+            positions = np.linspace(POSITION["min"], POSITION["max"], resolution)
+            velocities = np.linspace(VELOCITY["min"], VELOCITY["max"], resolution)
+            position_grid, velocity_grid = np.meshgrid(positions, velocities, indexing='ij')
+
+            # States at the goal have value 0, and (as in value) their tiles are never looked up
+            terminal = position_grid == POSITION["max"]
+
+            # Rows are ordered by position, velocity and action, so the hash table assigns the same indices as calling
+            # cost_to_go point by point (positions in the outer loop)
+            actions_number = len(all_actions)
+            floats = np.stack([self.position_scale * position_grid[~terminal], self.velocity_scale * velocity_grid[~terminal]], axis=1)
+            active_tiles = tiles_batch(iht_or_size=self.hash_table,
+                                       num_tilings=self.num_of_tilings,
+                                       floats=np.repeat(floats, actions_number, axis=0),
+                                       ints=np.tile(list(all_actions.values()), len(floats))[:, None])
+
+            self.grid_tiles[resolution] = positions, velocities, terminal, active_tiles.reshape(len(floats), actions_number, -1)
+
+        positions, velocities, terminal, active_tiles = self.grid_tiles[resolution]
+
+        costs = np.zeros(terminal.shape)
+        costs[~terminal] = -np.max(np.take(self.weights, active_tiles).sum(axis=2), axis=1)
+
+        return positions, velocities, costs
 
         # endregion Body
 
@@ -355,24 +435,13 @@ def print_cost(value_function, episode, ax):
 
     grid_size = 40
 
-    positions = np.linspace(POSITION["min"], POSITION["max"], grid_size)
-
-    # positionStep = (POSITION_MAX - POSITION_MIN) / grid_size
-    # positions = np.arange(POSITION_MIN, POSITION_MAX + positionStep, positionStep)
-    # velocityStep = (VELOCITY_MAX - VELOCITY_MIN) / grid_size
-    # velocities = np.arange(VELOCITY_MIN, VELOCITY_MAX + velocityStep, velocityStep)
-
-    velocities = np.linspace(VELOCITY["min"], VELOCITY["max"], grid_size)
-
-    axis_x = []
-    axis_y = []
-    axis_z = []
+    # The VF caches the active tiles of the grid, so every later plot only gathers weights
+    positions, velocities, costs = value_function.cost_to_go_grid(grid_size)
+    position_grid, velocity_grid = np.meshgrid(positions, velocities, indexing='ij')
 
-    for position in positions:
-        for velocity in velocities:
-            axis_x.append(position)
-            axis_y.append(velocity)
-            axis_z.append(value_function.cost_to_go(position, velocity))
+    axis_x = position_grid.ravel()
+    axis_y = velocity_grid.ravel()
+    axis_z = costs.ravel()
 
     ax.scatter(axis_x, axis_y, axis_z)
 
@@ -0,0 +1,409 @@
+import numpy as np
+
+from tile_coding import ArrayIHT, tiles_batch
+
+from src.mountain_car import POSITION, VELOCITY, all_actions, exploration_probability
+
+# region Helpers
+
+def step_batch(position, velocity, action):
+    # region Summary
+    """
+    Take actions at states (positions and velocities) of many cars, with the same dynamics as step()
+    :param position: Current positions
+    :param velocity: Current velocities
+    :param action: Current actions
+    :return: New positions, new velocities, rewards (always -1)
+    """
+    # endregion Summary
+
+    # region Body
+
+    # Calculate new velocities
+    new_velocity = np.clip(velocity + 0.001 * action - 0.0025 * np.cos(3 * position), VELOCITY["min"], VELOCITY["max"])
+
+    # Calculate new positions
+    new_position = np.clip(position + new_velocity, POSITION["min"], POSITION["max"])
+
+    # The reward in this problem is -1 on all time steps until the car moves past its goal position
+    reward = np.full(len(new_position), -1.0)
+
+    # Cars that reached the left bound get their velocity reset to 0
+    new_velocity[new_position == POSITION["min"]] = 0.0
+
+    return new_position, new_velocity, reward
+
+    # endregion Body
+
+
+class MountainCarBatch:
+    # region Summary
+    """
+    N independent mountain cars stepped together with array operations.
+    Cars that reach the goal are reset to a new start state right away (auto-reset), so every car always runs an episode.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, cars, rand=np.random):
+        # region Summary
+        """
+        Constructor of MountainCarBatch class
+        :param cars: Number of cars (denoted as N)
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for start states
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.cars = cars
+        self.rand = rand
+
+        # State of every car
+        self.position = np.zeros(cars)
+        self.velocity = np.zeros(cars)
+
+        # Number of steps of the current episode of every car
+        self.steps = np.zeros(cars, dtype=int)
+
+        self.reset()
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def reset(self, cars=None):
+        # region Summary
+        """
+        Start new episodes at a random position around the bottom of the valley with 0 velocity
+        :param cars: Boolean mask or indices of the cars to reset (all cars if None)
+        """
+        # endregion Summary
+
+        # region Body
+
+        cars = np.arange(self.cars) if cars is None else np.flatnonzero(cars) if np.asarray(cars).dtype == bool else cars
+
+        self.position[cars] = self.rand.uniform(-0.6, -0.4, len(cars))
+        self.velocity[cars] = 0.0
+        self.steps[cars] = 0
+
+        # endregion Body
+
+    def step(self, action):
+        # region Summary
+        """
+        Take an action in every car. Cars that reach the goal are reset afterwards,
+        so the returned states are the states reached by the actions, while self.position and self.velocity hold the next states.
+        :param action: Actions of shape (N,)
+        :return: New positions, new velocities, rewards, and a mask of the cars whose episode has terminated
+        """
+        # endregion Summary
+
+        # region Body
+
+        new_position, new_velocity, reward = step_batch(self.position, self.velocity, action)
+
+        self.steps += 1
+
+        # The goal was reached and the episode was terminated
+        done = new_position == POSITION["max"]
+
+        self.position = new_position.copy()
+        self.velocity = new_velocity.copy()
+
+        if np.any(done):
+            self.reset(done)
+
+        return new_position, new_velocity, reward, done
+
+        # endregion Body
+
+    # endregion Functions
+
+
+class BatchedValueFunction:
+    # region Summary
+    """
+    State-action VFs of N independent learners, stored together so all of them are evaluated and updated with array operations.
+    Learners share 1 array-backed hash table with the learner as an extra tile coordinate, so they never share a tile:
+    the table and the weight vector hold N × max_size tiles.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, step_size, learners, num_of_tilings=8, max_size=2048):
+        # region Summary
+        """
+        Constructor of BatchedValueFunction class
+        :param step_size: Step-size parameter
+        :param learners: Number of learners (denoted as N)
+        :param num_of_tilings: Number of tilings
+        :param max_size: The maximum number of indices per learner
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Divide step size equally to each tiling
+        self.step_size = step_size / num_of_tilings
+
+        self.learners = learners
+        self.num_of_tilings = num_of_tilings
+        self.max_size = max_size
+
+        # Hash table
+        self.hash_table = ArrayIHT(learners * max_size)
+
+        # Weight for each tile
+        self.weights = np.zeros(learners * max_size)
+
+        # State features (position and velocity) need scaling to satisfy the tile software
+        self.position_scale = self.num_of_tilings / (POSITION["max"] - POSITION["min"])
+        self.velocity_scale = self.num_of_tilings / (VELOCITY["max"] - VELOCITY["min"])
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def get_active_tiles(self, learner, position, velocity, action):
+        # region Summary
+        """
+        Get indices of active tiles for given learners, states and actions
+        :param learner: Learners
+        :param position: Positions
+        :param velocity: Velocities
+        :param action: Actions
+        :return: Active tiles of shape (len(learner), num_of_tilings)
+        """
+        # endregion Summary
+
+        # region Body
+
+        return tiles_batch(iht_or_size=self.hash_table,
+                           num_tilings=self.num_of_tilings,
+                           floats=np.stack([self.position_scale * position, self.velocity_scale * velocity], axis=1),
+                           ints=np.stack([action, learner], axis=1))
+
+        # endregion Body
+
+    def value(self, learner, position, velocity, action):
+        # region Summary
+        """
+        Estimate the values of given learners, states and actions
+        :param learner: Learners
+        :param position: Positions
+        :param velocity: Velocities
+        :param action: Actions
+        :return: Value estimates (0 at the goal)
+        """
+        # endregion Summary
+
+        # region Body
+
+        value_estimate = np.take(self.weights, self.get_active_tiles(learner, position, velocity, action)).sum(axis=1)
+
+        # The episode was terminated at the goal
+        value_estimate[position == POSITION["max"]] = 0.0
+
+        return value_estimate
+
+        # endregion Body
+
+    def values_for_all_actions(self, learner, position, velocity):
+        # region Summary
+        """
+        Estimate the values of given learners and states for every action
+        :param learner: Learners
+        :param position: Positions
+        :param velocity: Velocities
+        :return: Value estimates of shape (len(learner), number of actions), in the order of all_actions
+        """
+        # endregion Summary
+
+        # region Body
+
+        actions_number = len(all_actions)
+
+        values = self.value(np.repeat(learner, actions_number),
+                            np.repeat(position, actions_number),
+                            np.repeat(velocity, actions_number),
+                            np.tile(list(all_actions.values()), len(learner)))
+
+        return values.reshape(len(learner), actions_number)
+
+        # endregion Body
+
+    def learn(self, learner, position, velocity, action, target):
+        # region Summary
+        """
+        Learn with given learners, states, actions and targets
+        :param learner: Learners (every learner at most once)
+        :param position: Positions
+        :param velocity: Velocities
+        :param action: Actions
+        :param target: Targets
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Get indices of active tiles for given states and actions
+        active_tiles = self.get_active_tiles(learner, position, velocity, action)
+
+        # Calculate value estimates
+        value_estimation = np.take(self.weights, active_tiles).sum(axis=1)
+
+        # Calculate update sizes
+        update_size = self.step_size * (target - value_estimation)
+
+        # Update active tiles' weights (np.add.at in case a full table maps 2 tiles to the same index)
+        np.add.at(self.weights, active_tiles, np.broadcast_to(update_size[:, None], active_tiles.shape))
+
+        # endregion Body
+
+    # endregion Functions
+
+# endregion Helpers
+
+# region Functions
+
+def get_actions(learner, position, velocity, value_function, rand=np.random):
+    # region Summary
+    """
+    Get actions of given learners at given states based on ε-greedy policy and given VF, breaking ties randomly
+    :param learner: Learners
+    :param position: Positions
+    :param velocity: Velocities
+    :param value_function: BatchedValueFunction
+    :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for sampling
+    :return: Actions
+    """
+    # endregion Summary
+
+    # region Body
+
+    action_values = np.array(list(all_actions.values()))
+
+    values = value_function.values_for_all_actions(learner, position, velocity)
+
+    # Random keys only decide between the actions with the highest value
+    keys = np.where(values == np.max(values, axis=1, keepdims=True), rand.random(values.shape), -1.)
+    action = action_values[np.argmax(keys, axis=1)]
+
+    # ε-greedy: some learners select randomly from among all the actions
+    if exploration_probability > 0:
+        explore = rand.random(len(learner)) < exploration_probability
+        action[explore] = rand.choice(action_values, np.count_nonzero(explore))
+
+    return action
+
+    # endregion Body
+
+def batched_semi_gradient_n_step_sarsa(value_function, episodes, number_of_steps=1, rand=np.random):
+    # region Summary
+    """
+    Semi-gradient n-step SARSA for N independent learners in lockstep, each with its own car.
+    Every learner runs the same updates as semi_gradient_n_step_sarsa episode after episode; a learner whose episode terminates
+    makes its remaining updates at once and starts its next episode on the following step.
+    :param value_function: BatchedValueFunction of N learners
+    :param episodes: Number of episodes per learner
+    :param number_of_steps: Number of steps (denoted as n)
+    :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for sampling
+    :return: Steps of every episode of every learner, shape (N, episodes)
+    """
+    # endregion Summary
+
+    # region Body
+
+    learners = value_function.learners
+    n = number_of_steps
+    all_learners = np.arange(learners)
+
+    environment = MountainCarBatch(learners, rand)
+
+    # The last n + 1 states, actions and rewards of every learner, indexed by time step modulo n + 1
+    buffer = n + 1
+    positions = np.zeros((learners, buffer))
+    velocities = np.zeros((learners, buffer))
+    actions = np.zeros((learners, buffer), dtype=int)
+    rewards = np.zeros((learners, buffer))
+
+    # Steps of every episode of every learner, and the number of finished episodes
+    episode_steps = np.zeros((learners, episodes), dtype=int)
+    finished = np.zeros(learners, dtype=int)
+
+    # Start the first episodes
+    positions[:, 0] = environment.position
+    velocities[:, 0] = environment.velocity
+    actions[:, 0] = get_actions(all_learners, environment.position, environment.velocity, value_function, rand)
+
+    while np.any(finished < episodes):
+        # Learners that finished all their episodes stop learning
+        active = finished < episodes
+
+        # Time step (denoted as t) of the new states, taken before the environment resets terminated episodes
+        time_step = environment.steps + 1
+
+        # Take current actions and move to the new states
+        new_position, new_velocity, reward, done = environment.step(actions[all_learners, (time_step - 1) % buffer])
+
+        index = time_step % buffer
+        positions[all_learners, index] = new_position
+        velocities[all_learners, index] = new_velocity
+        rewards[all_learners, index] = reward
+
+        # Choose new actions for the learners that are still in their episode. Learners that finished all their episodes keep
+        # their last actions: their cars still move, but their states aren't tile-coded into the shared hash table anymore
+        running = active & ~done
+        actions[all_learners[running], index[running]] = get_actions(all_learners[running], new_position[running],
+                                                                     new_velocity[running], value_function, rand)
+
+        # Update the state-action values of time τ = t - n
+        learner = all_learners[active & (time_step >= n)]
+        if len(learner):
+            update_time = time_step[learner] - n
+
+            # Sum of the n rewards after τ, plus the value of the state and action at τ + n unless it's terminal
+            returns = sum(rewards[learner, (update_time + k) % buffer] for k in range(1, n + 1))
+            bootstrap = learner[~done[learner]]
+            returns[~done[learner]] += value_function.value(bootstrap, new_position[bootstrap], new_velocity[bootstrap],
+                                                            actions[bootstrap, time_step[bootstrap] % buffer])
+
+            value_function.learn(learner, positions[learner, update_time % buffer], velocities[learner, update_time % buffer],
+                                 actions[learner, update_time % buffer], returns)
+
+        # Learners whose episode terminated at T make the remaining updates for τ = T - n + 1, ..., T - 1
+        for k in range(n - 1, 0, -1):
+            learner = all_learners[active & done & (time_step - k >= 0)]
+            if len(learner):
+                update_time = time_step[learner] - k
+                returns = sum(rewards[learner, (update_time + j) % buffer] for j in range(1, k + 1))
+
+                value_function.learn(learner, positions[learner, update_time % buffer], velocities[learner, update_time % buffer],
+                                     actions[learner, update_time % buffer], returns)
+
+        # Record the terminated episodes
+        learner = all_learners[active & done]
+        episode_steps[learner, finished[learner]] = time_step[learner]
+        finished[learner] += 1
+
+        # Start the next episodes of the learners that still have episodes to run
+        learner = all_learners[done & (finished < episodes)]
+        if len(learner):
+            positions[learner, 0] = environment.position[learner]
+            velocities[learner, 0] = environment.velocity[learner]
+            actions[learner, 0] = get_actions(learner, environment.position[learner], environment.velocity[learner],
+                                              value_function, rand)
+
+    return episode_steps
+
+    # endregion Body
+
+# endregion Functions
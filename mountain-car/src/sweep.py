@@ -0,0 +1,108 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.mountain_car import ValueFunction, semi_gradient_n_step_sarsa
+
+# region Helpers
+
+def run_job(args):
+    # region Summary
+    """
+    Learn with 1 (n, step size, run) combination for all episodes and write its steps per episode into the shared memory
+    :param args: Tuple of (shared memory name, steps shape, (n index, step size index, run), n, step size, episodes,
+                 number of tilings, maximum number of indices, seed sequence)
+    """
+    # endregion Summary
+
+    # region Body
+
+    memory_name, shape, index, number_of_steps, step_size, episodes, num_of_tilings, max_size, seed_sequence = args
+
+    # semi_gradient_n_step_sarsa samples from the global np.random, so every job seeds it from its own SeedSequence
+    np.random.seed(seed_sequence.generate_state(4))
+
+    # Every job builds its own VF, so nothing large is pickled
+    value_function = ValueFunction(step_size, num_of_tilings, max_size)
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+
+    try:
+        steps = np.ndarray(shape, dtype=np.int64, buffer=memory.buf)
+
+        for episode in range(episodes):
+            steps[index + (episode,)] = semi_gradient_n_step_sarsa(value_function, number_of_steps)
+
+        # The view must be released before the shared memory can be closed
+        del steps
+
+    finally:
+        memory.close()
+
+    # endregion Body
+
+# endregion Helpers
+
+# region Functions
+
+def sweep(n_steps, step_sizes, runs, episodes, num_of_tilings=8, max_size=2048, skip=None, max_workers=None, seed=None):
+    # region Summary
+    """
+    Run semi-gradient n-step SARSA for every (n, step size, run) combination on a process pool (e.g. for Figures 10.2–10.4).
+    Each combination is an independent job seeded through SeedSequence.spawn, so results are reproducible for any number of workers.
+    :param n_steps: Numbers of steps (denoted as n)
+    :param step_sizes: Step-size parameters (before dividing by the number of tilings)
+    :param runs: Number of runs
+    :param episodes: Number of episodes per run
+    :param num_of_tilings: Number of tilings
+    :param max_size: The maximum number of indices
+    :param skip: Optional function of (n, step size) that returns True for combinations that shouldn't be run (e.g. diverging ones)
+    :param max_workers: Number of worker processes (all CPUs if None)
+    :param seed: Seed of the root SeedSequence
+    :return: Steps per episode of shape (len(n_steps), len(step_sizes), runs, episodes), -1 for skipped combinations
+    """
+    # endregion Summary
+
+    # region Body
+
+    shape = (len(n_steps), len(step_sizes), runs, episodes)
+
+    # Every combination gets its seed whether it's skipped or not, so skipping doesn't change the other results
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(n_steps) * len(step_sizes) * runs)
+
+    # Every job writes its steps into its own slice, so nothing large is pickled back
+    memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(np.int64).itemsize)
+
+    try:
+        steps = np.ndarray(shape, dtype=np.int64, buffer=memory.buf)
+        steps.fill(-1)
+
+        args_list = []
+        for index in np.ndindex(*shape[:3]):
+            n_index, step_size_index, _ = index
+            number_of_steps, step_size = int(n_steps[n_index]), float(step_sizes[step_size_index])
+
+            if skip is not None and skip(number_of_steps, step_size):
+                continue
+
+            args_list.append((memory.name, shape, index, number_of_steps, step_size, episodes, num_of_tilings, max_size,
+                              seed_sequences[np.ravel_multi_index(index, shape[:3])]))
+
+        with ProcessPoolExecutor(max_workers=max_workers or mp.cpu_count()) as executor:
+            list(executor.map(run_job, args_list))
+
+        result = steps.copy()
+
+        del steps
+
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return result
+
+    # endregion Body
+
+# endregion Functions
@@ -0,0 +1,171 @@
+import numpy as np
+
+class RunningStatistics:
+    # region Summary
+    """
+    Online per-time-step statistics over runs.
+    Keeps running means and variances (Welford's algorithm, merged with Chan's formula for batches of runs) and an optional
+    reservoir sample per time step for quantiles, so memory is O(times) whatever the number of runs.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, times, reservoir_size=0, rand=np.random):
+        # region Summary
+        """
+        Constructor of RunningStatistics class
+        :param times: Number of times
+        :param reservoir_size: Number of samples kept per time step for quantile estimates (0 disables quantiles)
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for reservoir sampling
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.times = times
+        self.reservoir_size = reservoir_size
+        self.rand = rand
+
+        # Number of samples seen at every time step
+        self.count = np.zeros(times)
+
+        # Running mean at every time step
+        self.mean = np.zeros(times)
+
+        # Running sum of squared deviations from the mean at every time step (denoted as 𝑀_2 in Welford's algorithm)
+        self.squared_deviations = np.zeros(times)
+
+        # Uniform reservoir sample at every time step
+        self.reservoir = np.zeros((times, reservoir_size)) if reservoir_size > 0 else None
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def update(self, samples):
+        # region Summary
+        """
+        Add 1 run, i.e. 1 sample for every time step
+        :param samples: Samples of shape (times,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.count += 1
+
+        # Welford's algorithm
+        delta = samples - self.mean
+        self.mean += delta / self.count
+        self.squared_deviations += delta * (samples - self.mean)
+
+        if self.reservoir is not None:
+            self.sample_reservoir(np.arange(self.times), self.count - 1, samples)
+
+        # endregion Body
+
+    def update_step(self, time, samples):
+        # region Summary
+        """
+        Add a batch of runs at 1 time step
+        :param time: Time step
+        :param samples: Samples of shape (runs,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        batch_count = len(samples)
+        batch_mean = np.mean(samples)
+        batch_squared_deviations = np.sum(np.square(samples - batch_mean))
+
+        count = self.count[time]
+        total = count + batch_count
+
+        # Chan's formula for merging the statistics of 2 sets of samples
+        delta = batch_mean - self.mean[time]
+        self.mean[time] += delta * batch_count / total
+        self.squared_deviations[time] += batch_squared_deviations + delta ** 2 * count * batch_count / total
+        self.count[time] = total
+
+        if self.reservoir is not None:
+            self.sample_reservoir(np.full(batch_count, time), count + np.arange(batch_count), samples)
+
+        # endregion Body
+
+    def sample_reservoir(self, times, positions, samples):
+        # region Summary
+        """
+        Reservoir sampling: the n-th sample of a time step replaces a random slot with probability size / n
+        :param times: Time step of every sample
+        :param positions: 0-based position of every sample in the stream of its time step
+        :param samples: Samples
+        """
+        # endregion Summary
+
+        # region Body
+
+        slots = np.where(positions < self.reservoir_size,
+                         positions,
+                         np.floor(self.rand.random(len(samples)) * (positions + 1))).astype(int)
+        kept = slots < self.reservoir_size
+
+        self.reservoir[times[kept], slots[kept]] = samples[kept]
+
+        # endregion Body
+
+    def variance(self):
+        # region Summary
+        """
+        Unbiased sample variance at every time step
+        :return: Variances of shape (times,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        return self.squared_deviations / np.maximum(self.count - 1, 1)
+
+        # endregion Body
+
+    def standard_error(self):
+        # region Summary
+        """
+        Standard error of the mean at every time step
+        :return: Standard errors of shape (times,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        return np.sqrt(self.variance() / np.maximum(self.count, 1))
+
+        # endregion Body
+
+    def quantile(self, q):
+        # region Summary
+        """
+        Estimate quantiles at every time step from the reservoir sample
+        :param q: Quantile or sequence of quantiles in [0, 1]
+        :return: Quantiles of shape (times,) or (len(q), times)
+        """
+        # endregion Summary
+
+        # region Body
+
+        if self.reservoir is None:
+            raise ValueError("Quantiles need reservoir_size > 0")
+
+        # Until a reservoir is full, only its first slots hold samples
+        filled = int(min(np.min(self.count), self.reservoir_size))
+        if filled == 0:
+            raise ValueError("No samples have been added yet")
+
+        return np.quantile(self.reservoir[:, :filled], q, axis=1)
+
+        # endregion Body
+
+    # endregion Functions
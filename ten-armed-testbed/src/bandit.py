@@ -1,10 +1,15 @@
 import numpy as np
 
+from src.random_buffer import RandomBuffer
+from src.tournament_tree import TournamentTree, KineticTournamentTree
+
 class Bandit:
     # region Constructor
 
     def __init__(self, arms_number: int = 10, use_sample_averages: bool = False, epsilon=0., initial_action_value_estimates=0., confidence_level=None,
-                 use_gradient: bool = False, step_size=0.1, use_gradient_baseline: bool = False, true_expected_reward=0.):
+                 use_gradient: bool = False, step_size=0.1, use_gradient_baseline: bool = False, true_expected_reward=0.,
+                 nonstationary: bool = False, random_walk_std=0.01, use_tournament_tree: bool = False,
+                 rand=np.random, buffer_size=1024, use_thompson_sampling: bool = False, bernoulli_rewards: bool = False):
         # region Summary
         """
         k-armed Bandit.
@@ -17,11 +22,22 @@ class Bandit:
         :param step_size: (denoted as 𝛼) constant step size for updating estimates
         :param use_gradient_baseline: if True, use average reward as baseline for GBA
         :param true_expected_reward: true expected rewards selected from normal (Gaussian) distribution with μ=4 mean and σ=1 variance
+        :param nonstationary: if True, all action values start out equal and take independent random walks (Exercise 2.5)
+        :param random_walk_std: standard deviation of the normal increment added to every action value on each step of the random walk
+        :param use_tournament_tree: if True, keep greedy/UCB estimates in a tournament tree so selection costs O(log k) instead of O(k)
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator (e.g. np.random.default_rng(seed) for reproducible runs)
+        :param buffer_size: number of uniform and normal samples drawn from rand at once for the per-step draws
+        :param use_thompson_sampling: if True, select actions by Thompson sampling from conjugate posteriors
+                                      (Beta-Bernoulli with bernoulli_rewards, otherwise Gaussian-Gaussian with prior mean initial_action_value_estimates)
+        :param bernoulli_rewards: if True, action values are success probabilities drawn uniformly from [0, 1] and rewards are 0 or 1
         """
         # endregion Summary
 
         # region Body
 
+        if use_tournament_tree and (use_gradient or use_thompson_sampling):
+            raise ValueError("GBA and Thompson sampling change every action's score on each step, so they can't use a tournament tree")
+
         self.k = arms_number
         self.actions = np.arange(self.k)
 
@@ -72,6 +88,10 @@ class Bandit:
         # Probability of taking action 𝑎 at time 𝑡 (denoted as 𝜋_𝑡(𝑎))
         self.action_probability = None
 
+        # Preallocated buffers for the soft-max: cumulative preferences for inverse-CDF sampling and the preference update
+        self.cumulative_probability = None
+        self.preference_update = None
+
         self.step_size = step_size
 
         # Average of the rewards up to (but not including) time 𝑡 (denoted as 𝑅̅_𝑡)
@@ -83,10 +103,50 @@ class Bandit:
 
         # endregion GBA
 
+        # region Thompson Sampling
+
+        # Posterior of each action value is kept in estimated_action_values (posterior mean) and action_selection_count:
+        # Gaussian-Gaussian: prior 𝒩(𝑄_1(𝑎), 1) and unit reward variance, so the posterior is 𝒩(𝑄_𝑡(𝑎), 1 / (1 + 𝑁_𝑡(𝑎)))
+        # Beta-Bernoulli: prior Beta(1, 1), so the posterior is Beta(𝑄_𝑡(𝑎)(2 + 𝑁_𝑡(𝑎)), (1 - 𝑄_𝑡(𝑎))(2 + 𝑁_𝑡(𝑎)))
+        self.use_thompson_sampling = use_thompson_sampling
+
+        # endregion Thompson Sampling
+
         # endregion Action Selection Methods
 
         # endregion Action-Value Methods
 
+        # region Nonstationary Problem
+
+        self.nonstationary = nonstationary
+        self.random_walk_std = random_walk_std
+
+        # endregion Nonstationary Problem
+
+        # region Bernoulli Problem
+
+        self.bernoulli_rewards = bernoulli_rewards
+
+        # endregion Bernoulli Problem
+
+        # region Large k
+
+        self.use_tournament_tree = use_tournament_tree
+
+        # Tournament tree over estimated action values (greedy) or UCB estimates (UCB)
+        self.tree = None
+
+        # endregion Large k
+
+        # region Random Numbers
+
+        self.rand = rand
+
+        # Per-step draws (exploration, tie breaking, rewards) are served from pre-drawn blocks
+        self.random = RandomBuffer(rand, buffer_size)
+
+        # endregion Random Numbers
+
         # Optimal action
         self.optimal_action = None
 
@@ -107,11 +167,22 @@ class Bandit:
 
         # Initialize action values according to a normal (Gaussian) distribution with μ=0 mean and σ=1 variance.
         # In case of GBA, add true_expected_reward != 0.
-        self.action_values = np.random.randn(self.k) + self.true_expected_reward
+        # In case of a nonstationary problem, all action values start out equal and then take independent random walks.
+        # In case of Bernoulli rewards, action values are success probabilities drawn uniformly from [0, 1].
+        if self.bernoulli_rewards:
+            self.action_values = np.full(self.k, 0.5) if self.nonstationary else self.rand.random(self.k)
+        elif self.nonstationary:
+            self.action_values = np.zeros(self.k) + self.true_expected_reward
+        else:
+            self.action_values = self.rand.standard_normal(self.k) + self.true_expected_reward
 
         # In case of realistic initial values, initialize estimated action values with 0s.
         # In case of optimistic initial values, add initial_action_value_estimates != 0
-        self.estimated_action_values = np.zeros(self.k) + self.initial_action_value_estimates
+        # In case of Beta-Bernoulli Thompson sampling, start from the mean of the Beta(1, 1) prior
+        if self.use_thompson_sampling and self.bernoulli_rewards:
+            self.estimated_action_values = np.full(self.k, 0.5)
+        else:
+            self.estimated_action_values = np.zeros(self.k) + self.initial_action_value_estimates
 
         # Set time steps to 0
         self.time = 0
@@ -122,6 +193,39 @@ class Bandit:
         # Optimal action is the action with the highest value
         self.optimal_action = np.argmax(self.action_values)
 
+        # GBA works in place on buffers allocated once per run
+        if self.use_gradient:
+            self.action_probability = np.full(self.k, 1 / self.k)
+            self.cumulative_probability = np.empty(self.k)
+            self.preference_update = np.empty(self.k)
+
+        # UCB estimates are linear in 𝑐√ln(𝑡 + 1), which a kinetic tournament tree can follow as time advances
+        if self.use_tournament_tree:
+            if self.confidence_level is not None:
+                self.tree = KineticTournamentTree(self.estimated_action_values, 1 / (self.action_selection_count + 1e-5), self.random)
+            else:
+                self.tree = TournamentTree(self.estimated_action_values, self.random)
+
+        # endregion Body
+
+    def argmax(self, values):
+        # region Summary
+        """
+        Select one of the actions with the highest value, breaking ties randomly
+        :param values: Value of each action
+        :return: Action
+        """
+        # endregion Summary
+
+        # region Body
+
+        greedy_actions = np.flatnonzero(values == np.max(values))
+
+        if len(greedy_actions) == 1:
+            return greedy_actions[0]
+
+        return greedy_actions[self.random.integer(len(greedy_actions))]
+
         # endregion Body
 
     def act(self):
@@ -137,24 +241,49 @@ class Bandit:
         # region ε-greedy
 
         # ε-greedy action selection: every once in a while, with small probability ε, select randomly from among all the actions with equal probability, independently of the action-value estimates.
-        if np.random.rand() < self.epsilon:
-            return np.random.choice(self.actions)
+        if self.random.random() < self.epsilon:
+            return self.random.integer(self.k)
 
         # endregion ε-greedy
 
         # region UCB
         if self.confidence_level is not None:
+            if self.tree is not None:
+                self.tree.advance(self.confidence_level * np.sqrt(np.log(self.time + 1)))
+                return self.tree.argmax()
+
             UCB_estimation = (self.estimated_action_values +
             self.confidence_level * np.sqrt(np.log(self.time+1)) / (self.action_selection_count + 1e-5))
-            action = np.random.choice(np.where(UCB_estimation == np.max ( UCB_estimation))[0])
-            return action
+            return self.argmax(UCB_estimation)
+
 
+        # region Thompson Sampling
+
+        # Draw 1 sample from every action's posterior and act greedily with respect to the samples
+        if self.use_thompson_sampling:
+            if self.bernoulli_rewards:
+                pseudo_count = self.action_selection_count + 2
+                successes = self.estimated_action_values * pseudo_count
+                samples = self.rand.beta(successes, pseudo_count - successes)
+            else:
+                samples = self.estimated_action_values + self.rand.standard_normal(self.k) / np.sqrt(1 + self.action_selection_count)
+
+            return self.argmax(samples)
+
+        # endregion Thompson Sampling
 
         # region GBA
         if self.use_gradient:
-            exponential_estimations = np.exp(self.estimated_action_values)
-            self.action_probability = exponential_estimations / np.sum(exponential_estimations)
-            return np.random.choice(self.actions, p = self.action_probability)
+            # Soft-max of preferences shifted by their maximum, so np.exp can't overflow: 𝜋(𝑎) ∝ exp(𝐻(𝑎) - max 𝐻)
+            np.subtract(self.estimated_action_values, np.max(self.estimated_action_values), out=self.action_probability)
+            np.exp(self.action_probability, out=self.action_probability)
+            np.cumsum(self.action_probability, out=self.cumulative_probability)
+
+            total = self.cumulative_probability[-1]
+            self.action_probability /= total
+
+            # Inverse-CDF sampling on the unnormalized cumulative sum with a buffered uniform draw
+            return min(np.searchsorted(self.cumulative_probability, self.random.random() * total, side='right'), self.k - 1)
         # endregion GBA
 
 
@@ -162,8 +291,10 @@ class Bandit:
 
         # Greedy action selection: select one of the actions with the highest estimated value, that is, one of the greedy actions.
         # If there is more than one greedy action, then a selection is made among them in some arbitrary way, perhaps randomly.
-        action = np.random.choice(np.where(self.estimated_action_values == np.max(self.estimated_action_values))[0])
-        return action
+        if self.tree is not None:
+            return self.tree.argmax()
+
+        return self.argmax(self.estimated_action_values)
         # endregion Greedy
 
         # endregion Body
@@ -180,8 +311,11 @@ class Bandit:
         # region Body
 
         # When a learning method applied to that bandit problem selected action 𝐴_𝑡 at time step 𝑡, the actual reward, 𝑅_𝑡, was selected from
-        # a normal (Gaussian) distribution with μ = 𝑞_∗(𝑎) mean and σ = 1 variance
-        actual_reward = np.random.randn() + self.action_values[action]
+        # a normal (Gaussian) distribution with μ = 𝑞_∗(𝑎) mean and σ = 1 variance (or was 1 with probability 𝑞_∗(𝑎) for Bernoulli rewards)
+        if self.bernoulli_rewards:
+            actual_reward = 1. if self.random.random() < self.action_values[action] else 0.
+        else:
+            actual_reward = self.random.standard_normal() + self.action_values[action]
 
         # Add 1 to time step
         self.time += 1
@@ -193,25 +327,47 @@ class Bandit:
         # The Bandit Gradient Algorithm as Stochastic Gradient Ascent
         self.average_reward += (actual_reward - self.average_reward) / self.time
 
-        if self.use_sample_averages: # Update estimated action values using sample-average method
+        if self.use_thompson_sampling: # Update the posterior mean, the prior counts as 1 (Gaussian) or 2 (Beta) pseudo-observations
+            prior_count = 2 if self.bernoulli_rewards else 1
+            self.estimated_action_values[action] += (actual_reward - self.estimated_action_values[action]) / (self.action_selection_count[action] + prior_count)
+
+        elif self.use_sample_averages: # Update estimated action values using sample-average method
             # Incremental Implementation (Equation 2.3)
             self.estimated_action_values[action] += (actual_reward - self.estimated_action_values[action]) / self.action_selection_count[action]
 
         elif self.use_gradient: # Update estimated action values using GBA
-            one_hot_encoding = np.zeros(self.k)
-            one_hot_encoding[action] = 1
-
             # The average of the rewards can serve as a baseline with which the reward is compared.
             baseline = self.average_reward if self.use_gradient_baseline else 0
 
             # A natural learning algorithm for soft-max action preferences based on the idea of stochastic gradient ascent:
             # on each step, after selecting action 𝐴_𝑡 and receiving the reward 𝑅_𝑡, the action preferences are updated by Equation 2.12:
-            self.estimated_action_values += self.step_size * (actual_reward - baseline) * (one_hot_encoding - self.action_probability)
+            # 𝐻(𝑎) -= 𝛼(𝑅 - 𝑅̅)𝜋(𝑎) for every action, then 𝐻(𝐴) += 𝛼(𝑅 - 𝑅̅) for the selected one, all in place
+            update_size = self.step_size * (actual_reward - baseline)
+            np.multiply(self.action_probability, update_size, out=self.preference_update)
+            self.estimated_action_values -= self.preference_update
+            self.estimated_action_values[action] += update_size
 
         else: # Update estimated action values with constant step size
             # Incremental Implementation (Equation 2.3) with constant step size parameter
             self.estimated_action_values[action] += self.step_size * (actual_reward - self.estimated_action_values[action])
 
+        # Only the selected action's estimate (and count) changed, so only its path in the tree is replayed
+        if self.tree is not None:
+            if self.confidence_level is not None:
+                self.tree.update(action, self.estimated_action_values[action], 1 / (self.action_selection_count[action] + 1e-5))
+            else:
+                self.tree.update(action, self.estimated_action_values[action])
+
+        # In case of a nonstationary problem, every action value takes a random walk step
+        if self.nonstationary:
+            self.action_values += self.random_walk_std * self.rand.standard_normal(self.k)
+
+            # success probabilities must stay in [0, 1]
+            if self.bernoulli_rewards:
+                np.clip(self.action_values, 0, 1, out=self.action_values)
+
+            self.optimal_action = np.argmax(self.action_values)
+
         return actual_reward
 
         # endregion Body
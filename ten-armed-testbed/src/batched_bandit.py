@@ -0,0 +1,257 @@
+import numpy as np
+
+class BatchedBandit:
+    # region Summary
+    """
+    k-armed Bandit that advances many independent runs at once.
+    Every per-run quantity of Bandit is kept as a row of a (runs, k) array, so a single act()/step() pair moves all runs forward by 1 time step.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, arms_number: int = 10, use_sample_averages: bool = False, epsilon=0., initial_action_value_estimates=0., confidence_level=None,
+                 use_gradient: bool = False, step_size=0.1, use_gradient_baseline: bool = False, true_expected_reward=0.,
+                 nonstationary: bool = False, random_walk_std=0.01, rand=np.random, use_thompson_sampling: bool = False, bernoulli_rewards: bool = False):
+        # region Summary
+        """
+        k-armed Bandit for a batch of runs. Parameters have the same meaning as in Bandit.
+        :param arms_number: (denoted as k) number of bandit's arms
+        :param use_sample_averages: if True, use sample-average method for estimating action values
+        :param epsilon: (denoted as ε) probability for exploration in ε-greedy algorithm
+        :param initial_action_value_estimates: (denoted as 𝑄_1(𝑎)) initial estimation for each action value
+        :param confidence_level: (denoted as 𝑐) if not None, use Upper-Confidence-Bound (UCB) action selection
+        :param use_gradient: if True, use Gradient Bandit Algorithm (GBA)
+        :param step_size: (denoted as 𝛼) constant step size for updating estimates
+        :param use_gradient_baseline: if True, use average reward as baseline for GBA
+        :param true_expected_reward: true expected rewards selected from normal (Gaussian) distribution with μ=4 mean and σ=1 variance
+        :param nonstationary: if True, all action values start out equal and take independent random walks (Exercise 2.5)
+        :param random_walk_std: standard deviation of the normal increment added to every action value on each step of the random walk
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for sampling
+        :param use_thompson_sampling: if True, select actions by Thompson sampling from conjugate posteriors
+                                      (Beta-Bernoulli with bernoulli_rewards, otherwise Gaussian-Gaussian with prior mean initial_action_value_estimates)
+        :param bernoulli_rewards: if True, action values are success probabilities drawn uniformly from [0, 1] and rewards are 0 or 1
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.k = arms_number
+        self.use_sample_averages = use_sample_averages
+        self.epsilon = epsilon
+        self.initial_action_value_estimates = initial_action_value_estimates
+        self.confidence_level = confidence_level
+        self.use_gradient = use_gradient
+        self.step_size = step_size
+        self.use_gradient_baseline = use_gradient_baseline
+        self.true_expected_reward = true_expected_reward
+        self.nonstationary = nonstationary
+        self.random_walk_std = random_walk_std
+        self.rand = rand
+        self.use_thompson_sampling = use_thompson_sampling
+        self.bernoulli_rewards = bernoulli_rewards
+
+        # Number of runs advanced together (set by initialize)
+        self.runs = 0
+        self.run_indices = None
+
+        # Per-run arrays of shape (runs, k), see Bandit for their meaning
+        self.action_values = None
+        self.estimated_action_values = None
+        self.action_selection_count = None
+        self.action_probability = None
+
+        # Per-run arrays of shape (runs,)
+        self.average_reward = None
+        self.optimal_action = None
+
+        # Time steps (all runs move in lockstep)
+        self.time = 0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def initialize(self, runs):
+        # region Summary
+        """
+        Initialize action parameters for a batch of independent runs
+        :param runs: Number of runs
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.runs = runs
+        self.run_indices = np.arange(runs)
+
+        # Every run gets its own bandit problem, drawn the same way as in Bandit.initialize
+        if self.bernoulli_rewards:
+            self.action_values = np.full((runs, self.k), 0.5) if self.nonstationary else self.rand.random((runs, self.k))
+        elif self.nonstationary:
+            self.action_values = np.zeros((runs, self.k)) + self.true_expected_reward
+        else:
+            self.action_values = self.rand.standard_normal((runs, self.k)) + self.true_expected_reward
+
+        if self.use_thompson_sampling and self.bernoulli_rewards:
+            self.estimated_action_values = np.full((runs, self.k), 0.5)
+        else:
+            self.estimated_action_values = np.zeros((runs, self.k)) + self.initial_action_value_estimates
+        self.action_selection_count = np.zeros((runs, self.k))
+        self.action_probability = np.full((runs, self.k), 1 / self.k)
+        self.average_reward = np.zeros(runs)
+        self.time = 0
+
+        self.optimal_action = np.argmax(self.action_values, axis=1)
+
+        # endregion Body
+
+    def argmax(self, values):
+        # region Summary
+        """
+        Row-wise argmax that breaks ties randomly, like np.random.choice(np.where(values == np.max(values))[0]) in Bandit
+        :param values: Values of shape (runs, k)
+        :return: Index of a maximal value for every row
+        """
+        # endregion Summary
+
+        # region Body
+
+        is_max = values == np.max(values, axis=1, keepdims=True)
+        action = np.argmax(values, axis=1)
+
+        # Only rows with several maximal values need random keys
+        tied = np.count_nonzero(is_max, axis=1) > 1
+        if np.any(tied):
+            keys = self.rand.random((np.count_nonzero(tied), self.k))
+            action[tied] = np.argmax(np.where(is_max[tied], keys, -1.), axis=1)
+
+        return action
+
+        # endregion Body
+
+    def act(self):
+        # region Summary
+        """
+        Get an action for every run.
+        :return: Actions of shape (runs,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # region UCB
+        if self.confidence_level is not None:
+            UCB_estimation = (self.estimated_action_values +
+                              self.confidence_level * np.sqrt(np.log(self.time + 1)) / (self.action_selection_count + 1e-5))
+            action = self.argmax(UCB_estimation)
+        # endregion UCB
+
+        # region Thompson Sampling
+        elif self.use_thompson_sampling:
+            # 1 posterior draw for every action of every run (see Bandit for the posteriors)
+            if self.bernoulli_rewards:
+                pseudo_count = self.action_selection_count + 2
+                successes = self.estimated_action_values * pseudo_count
+                samples = self.rand.beta(successes, pseudo_count - successes)
+            else:
+                samples = self.estimated_action_values + self.rand.standard_normal((self.runs, self.k)) / np.sqrt(1 + self.action_selection_count)
+
+            action = self.argmax(samples)
+        # endregion Thompson Sampling
+
+        # region GBA
+        elif self.use_gradient:
+            # Soft-max over preferences, shifted by the maximum so that np.exp can't overflow
+            exponential_estimations = np.exp(self.estimated_action_values - np.max(self.estimated_action_values, axis=1, keepdims=True))
+            cumulative = np.cumsum(exponential_estimations, axis=1)
+            self.action_probability = exponential_estimations / cumulative[:, -1:]
+
+            # Inverse-CDF sampling: the action is the number of cumulative weights below a uniform draw
+            thresholds = self.rand.random(self.runs) * cumulative[:, -1]
+            action = np.minimum(np.count_nonzero(cumulative <= thresholds[:, None], axis=1), self.k - 1)
+        # endregion GBA
+
+        # region Greedy
+        else:
+            action = self.argmax(self.estimated_action_values)
+        # endregion Greedy
+
+        # region ε-greedy
+
+        # With probability ε a run ignores the estimates and selects uniformly among all actions
+        if self.epsilon > 0:
+            explore = self.rand.random(self.runs) < self.epsilon
+            explore_count = np.count_nonzero(explore)
+            if explore_count:
+                action[explore] = (self.rand.random(explore_count) * self.k).astype(int)
+
+        # endregion ε-greedy
+
+        return action
+
+        # endregion Body
+
+    def step(self, action):
+        # region Summary
+        """
+        Update estimated action values and return rewards for the given actions.
+        :param action: Actions of shape (runs,)
+        :return: Rewards of shape (runs,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Rewards are drawn from a normal (Gaussian) distribution with μ = 𝑞_∗(𝑎) mean and σ = 1 variance (or are 1 with probability 𝑞_∗(𝑎))
+        if self.bernoulli_rewards:
+            actual_reward = (self.rand.random(self.runs) < self.action_values[self.run_indices, action]).astype(float)
+        else:
+            actual_reward = self.rand.standard_normal(self.runs) + self.action_values[self.run_indices, action]
+
+        # Add 1 to time step
+        self.time += 1
+
+        # Add 1 to number of times the selected actions have been selected
+        self.action_selection_count[self.run_indices, action] += 1
+
+        # The average of the rewards can be computed incrementally
+        self.average_reward += (actual_reward - self.average_reward) / self.time
+
+        if self.use_thompson_sampling: # Update the posterior mean, the prior counts as 1 (Gaussian) or 2 (Beta) pseudo-observations
+            prior_count = 2 if self.bernoulli_rewards else 1
+            self.estimated_action_values[self.run_indices, action] += ((actual_reward - self.estimated_action_values[self.run_indices, action])
+                                                                       / (self.action_selection_count[self.run_indices, action] + prior_count))
+
+        elif self.use_sample_averages: # Update estimated action values using sample-average method (Equation 2.3)
+            self.estimated_action_values[self.run_indices, action] += ((actual_reward - self.estimated_action_values[self.run_indices, action])
+                                                                       / self.action_selection_count[self.run_indices, action])
+
+        elif self.use_gradient: # Update estimated action values using GBA (Equation 2.12)
+            baseline = self.average_reward if self.use_gradient_baseline else 0
+            update = self.step_size * (actual_reward - baseline)
+
+            # 𝐻(𝑎) -= 𝛼(𝑅 - 𝑅̅)𝜋(𝑎) for every action, then 𝐻(𝐴) += 𝛼(𝑅 - 𝑅̅) for the selected one
+            self.estimated_action_values -= update[:, None] * self.action_probability
+            self.estimated_action_values[self.run_indices, action] += update
+
+        else: # Update estimated action values with constant step size
+            self.estimated_action_values[self.run_indices, action] += self.step_size * (actual_reward - self.estimated_action_values[self.run_indices, action])
+
+        # In case of a nonstationary problem, every action value takes a random walk step
+        if self.nonstationary:
+            self.action_values += self.random_walk_std * self.rand.standard_normal((self.runs, self.k))
+
+            # success probabilities must stay in [0, 1]
+            if self.bernoulli_rewards:
+                np.clip(self.action_values, 0, 1, out=self.action_values)
+
+            self.optimal_action = np.argmax(self.action_values, axis=1)
+
+        return actual_reward
+
+        # endregion Body
+
+    # endregion Functions
@@ -0,0 +1,199 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from src.bandit import Bandit
+from src.batched_bandit import BatchedBandit
+
+# region Hyper-parameters
+
+# Bandit configurations to benchmark (constructor kwargs shared by Bandit and BatchedBandit)
+configurations = dict(
+    sample_averages=dict(epsilon=0.1, use_sample_averages=True),
+    constant_step_size=dict(epsilon=0.1, step_size=0.1),
+    ucb=dict(confidence_level=2, use_sample_averages=True),
+    gradient_with_baseline=dict(use_gradient=True, step_size=0.1, use_gradient_baseline=True, true_expected_reward=4),
+    gradient_without_baseline=dict(use_gradient=True, step_size=0.1, use_gradient_baseline=False, true_expected_reward=4),
+)
+
+# A configuration is reported as a regression if it gets slower than the baseline by more than this fraction
+default_tolerance = 0.2
+
+# endregion Hyper-parameters
+
+# region Functions
+
+def time_steps(bandit, steps, repeats):
+    # region Summary
+    """
+    Time act()/step() pairs of an initialized bandit
+    :param bandit: Initialized Bandit or BatchedBandit
+    :param steps: Number of time steps per repeat
+    :param repeats: Number of repeats, the fastest one is kept to reduce noise
+    :return: Best elapsed time in seconds
+    """
+    # endregion Summary
+
+    # region Body
+
+    best = np.inf
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+
+        for _ in range(steps):
+            bandit.step(bandit.act())
+
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+    # endregion Body
+
+def run_benchmarks(arms_numbers=(10, 1000), runs_numbers=(100, 2000), steps=1000, repeats=3, seed=0):
+    # region Summary
+    """
+    Measure steps per second of every configuration for Bandit (1 run) and BatchedBandit (every number of runs)
+    :param arms_numbers: Numbers of arms (k)
+    :param runs_numbers: Numbers of runs advanced together by BatchedBandit
+    :param steps: Number of time steps per measurement
+    :param repeats: Number of repeats per measurement
+    :param seed: Seed of the generator used by the bandits
+    :return: List of results, each with name, engine, arms, runs and steps_per_second (run-steps for BatchedBandit)
+    """
+    # endregion Summary
+
+    # region Body
+
+    results = []
+
+    for name, config in configurations.items():
+        for arms_number in arms_numbers:
+            bandit = Bandit(arms_number=arms_number, rand=np.random.default_rng(seed), **config)
+            bandit.initialize()
+            elapsed = time_steps(bandit, steps, repeats)
+            results.append(dict(name=name, engine="Bandit", arms=arms_number, runs=1, steps_per_second=steps / elapsed))
+
+            for runs in runs_numbers:
+                bandit = BatchedBandit(arms_number=arms_number, rand=np.random.default_rng(seed), **config)
+                bandit.initialize(runs)
+                elapsed = time_steps(bandit, steps, repeats)
+                results.append(dict(name=name, engine="BatchedBandit", arms=arms_number, runs=runs, steps_per_second=runs * steps / elapsed))
+
+    return results
+
+    # endregion Body
+
+def save_results(results, path):
+    # region Summary
+    """
+    Write results with a description of the machine to a JSON file
+    :param results: Results of run_benchmarks
+    :param path: Output path
+    """
+    # endregion Summary
+
+    # region Body
+
+    document = dict(python=platform.python_version(), numpy=np.__version__, machine=platform.platform(),
+                    processor=platform.processor(), results=results)
+
+    with open(path, "w") as file:
+        json.dump(document, file, indent=2)
+
+    # endregion Body
+
+def load_results(path):
+    # region Summary
+    """
+    Read results from a JSON file written by save_results
+    :param path: Input path
+    :return: Results
+    """
+    # endregion Summary
+
+    # region Body
+
+    with open(path) as file:
+        return json.load(file)["results"]
+
+    # endregion Body
+
+def compare(results, baseline, tolerance=default_tolerance):
+    # region Summary
+    """
+    Compare results with a baseline
+    :param results: Current results
+    :param baseline: Baseline results
+    :param tolerance: Allowed relative slowdown
+    :return: List of (result, baseline steps per second) pairs that are slower than allowed
+    """
+    # endregion Summary
+
+    # region Body
+
+    baseline_speeds = {(result["name"], result["engine"], result["arms"], result["runs"]): result["steps_per_second"] for result in baseline}
+
+    regressions = []
+
+    for result in results:
+        baseline_speed = baseline_speeds.get((result["name"], result["engine"], result["arms"], result["runs"]))
+
+        if baseline_speed is not None and result["steps_per_second"] < (1 - tolerance) * baseline_speed:
+            regressions.append((result, baseline_speed))
+
+    return regressions
+
+    # endregion Body
+
+def main(arguments=None):
+    # region Summary
+    """
+    Command line entry point, run from the project directory: python -m src.benchmark --output results.json --baseline baseline.json
+    :param arguments: Command line arguments (sys.argv if None)
+    :return: Exit code, 1 if a configuration regressed against the baseline
+    """
+    # endregion Summary
+
+    # region Body
+
+    parser = argparse.ArgumentParser(description="Steps per second of the bandit act()/step() hot path")
+    parser.add_argument("--arms", type=int, nargs="+", default=[10, 1000], help="numbers of arms")
+    parser.add_argument("--runs", type=int, nargs="+", default=[100, 2000], help="numbers of runs for BatchedBandit")
+    parser.add_argument("--steps", type=int, default=1000, help="time steps per measurement")
+    parser.add_argument("--repeats", type=int, default=3, help="repeats per measurement (the fastest is kept)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare results with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=default_tolerance, help="allowed relative slowdown")
+    arguments = parser.parse_args(arguments)
+
+    results = run_benchmarks(arguments.arms, arguments.runs, arguments.steps, arguments.repeats)
+
+    for result in results:
+        print(f"{result['name']:<28}{result['engine']:<15}k={result['arms']:<8}runs={result['runs']:<8}{result['steps_per_second']:>16,.0f} steps/s")
+
+    if arguments.output:
+        save_results(results, arguments.output)
+
+    if arguments.baseline:
+        regressions = compare(results, load_results(arguments.baseline), arguments.tolerance)
+
+        for result, baseline_speed in regressions:
+            print(f"Regression: {result['name']} {result['engine']} k={result['arms']} runs={result['runs']}: "
+                  f"{result['steps_per_second']:,.0f} steps/s vs {baseline_speed:,.0f} in the baseline")
+
+        if regressions:
+            return 1
+
+    return 0
+
+    # endregion Body
+
+# endregion Functions
+
+if __name__ == "__main__":
+    sys.exit(main())
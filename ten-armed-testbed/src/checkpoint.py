@@ -0,0 +1,131 @@
+import json
+import os
+
+import numpy as np
+
+from src.batched_bandit import BatchedBandit
+
+# region Helpers
+
+def save_checkpoint(path, configs, runs, times, run_chunk, completed_runs, reward_sums, optimal_action_counts, rngs):
+    # region Summary
+    """
+    Write the state of a sweep to a .npz file. The file is written next to path and then renamed over it,
+    so an interrupt during saving never leaves a broken checkpoint behind.
+    :param path: Checkpoint path
+    :param configs: List of BatchedBandit constructor kwargs
+    :param runs: Number of runs per configuration
+    :param times: Number of times
+    :param run_chunk: Number of runs simulated between 2 checkpoints
+    :param completed_runs: Number of finished runs of every configuration, shape (len(configs),)
+    :param reward_sums: Sum of rewards over finished runs, shape (len(configs), times)
+    :param optimal_action_counts: Number of optimal actions over finished runs, shape (len(configs), times)
+    :param rngs: Generator of every configuration
+    """
+    # endregion Summary
+
+    # region Body
+
+    temporary_path = path + ".tmp"
+
+    # Generator states are dicts of Python ints (up to 128 bits), JSON keeps them exact
+    with open(temporary_path, "wb") as file:
+        np.savez_compressed(file,
+                            configs=np.array(json.dumps(configs, sort_keys=True)),
+                            runs=runs,
+                            times=times,
+                            run_chunk=run_chunk,
+                            completed_runs=completed_runs,
+                            reward_sums=reward_sums,
+                            optimal_action_counts=optimal_action_counts,
+                            rng_states=np.array([json.dumps(rng.bit_generator.state) for rng in rngs]))
+
+    os.replace(temporary_path, path)
+
+    # endregion Body
+
+def load_checkpoint(path, configs, runs, times, run_chunk, rngs):
+    # region Summary
+    """
+    Read the state of a sweep from a .npz file written by save_checkpoint and restore the generators in place
+    :param path: Checkpoint path
+    :param configs: List of BatchedBandit constructor kwargs, must be the same as when the checkpoint was saved
+    :param runs: Number of runs per configuration, must be the same as when the checkpoint was saved
+    :param times: Number of times, must be the same as when the checkpoint was saved
+    :param run_chunk: Number of runs simulated between 2 checkpoints, must be the same as when the checkpoint was saved,
+                      because chunks draw from the generators in a different order
+    :param rngs: Generator of every configuration, their states are overwritten
+    :return: Completed runs, reward sums and optimal action counts
+    """
+    # endregion Summary
+
+    # region Body
+
+    with np.load(path) as checkpoint:
+        if (str(checkpoint["configs"]) != json.dumps(configs, sort_keys=True)
+                or int(checkpoint["runs"]) != runs or int(checkpoint["times"]) != times
+                or "run_chunk" not in checkpoint.files or int(checkpoint["run_chunk"]) != run_chunk):
+            raise ValueError(f"Checkpoint {path} was saved for a different sweep")
+
+        for rng, state in zip(rngs, checkpoint["rng_states"]):
+            rng.bit_generator.state = json.loads(str(state))
+
+        return checkpoint["completed_runs"].copy(), checkpoint["reward_sums"].copy(), checkpoint["optimal_action_counts"].copy()
+
+    # endregion Body
+
+# endregion Helpers
+
+# region Functions
+
+def simulate_checkpointed(runs, times, configs, path, run_chunk=100, seed=None):
+    # region Summary
+    """
+    Same experiment as simulate, but BatchedBandit problems are simulated in chunks of runs and the sweep is saved to a .npz
+    checkpoint after every chunk. Calling it again with the same arguments resumes from the checkpoint, skips finished
+    configurations and gives bit-identical results to an uninterrupted sweep.
+    :param runs: Number of runs per configuration
+    :param times: Number of times
+    :param configs: List of BatchedBandit constructor kwargs (see parameter_grid)
+    :param path: Checkpoint path (.npz)
+    :param run_chunk: Number of runs simulated between 2 checkpoints
+    :param seed: Seed of the root SeedSequence
+    :return: Optimal action count mean and reward mean, each of shape (len(configs), times)
+    """
+    # endregion Summary
+
+    # region Body
+
+    # Every configuration draws from its own generator, so its results don't depend on the other configurations
+    rngs = [np.random.default_rng(seed_sequence) for seed_sequence in np.random.SeedSequence(seed).spawn(len(configs))]
+
+    if os.path.exists(path):
+        completed_runs, reward_sums, optimal_action_counts = load_checkpoint(path, configs, runs, times, run_chunk, rngs)
+    else:
+        completed_runs = np.zeros(len(configs), dtype=int)
+        reward_sums = np.zeros((len(configs), times))
+        optimal_action_counts = np.zeros((len(configs), times))
+
+    for i, config in enumerate(configs):
+        # Finished configurations are skipped
+        while completed_runs[i] < runs:
+            chunk_runs = min(run_chunk, runs - completed_runs[i])
+
+            bandit = BatchedBandit(rand=rngs[i], **config)
+            bandit.initialize(chunk_runs)
+
+            for time in range(times):
+                action = bandit.act()
+                reward_sums[i, time] += np.sum(bandit.step(action))
+                optimal_action_counts[i, time] += np.count_nonzero(action == bandit.optimal_action)
+
+            completed_runs[i] += chunk_runs
+
+            # Between chunks the generator is the only source of randomness, so its state is enough to resume exactly
+            save_checkpoint(path, configs, runs, times, run_chunk, completed_runs, reward_sums, optimal_action_counts, rngs)
+
+    return optimal_action_counts / runs, reward_sums / runs
+
+    # endregion Body
+
+# endregion Functions
@@ -0,0 +1,234 @@
+import numpy as np
+
+class LinearBandit:
+    # region Summary
+    """
+    Contextual k-armed Bandit with linear action values: the expected reward of action 𝑎 in context 𝒙 is 𝒙ᵀ𝜽_∗(𝑎).
+    Actions are selected by LinUCB or by linear Thompson sampling. Each arm keeps the inverse of its regularized design matrix
+    𝑨(𝑎) = 𝜆𝑰 + Σ 𝒙𝒙ᵀ, updated by Sherman–Morrison (1 context), Woodbury (up to d contexts) or a d×d solve (more contexts) instead of re-inverting.
+    act() and step() accept a single context of shape (d,) or a batch of contexts of shape (n, d).
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, arms_number: int = 10, context_dimension: int = 5, confidence_level=1., use_thompson_sampling: bool = False,
+                 regularization=1., noise_std=1., rand=np.random):
+        # region Summary
+        """
+        Constructor of LinearBandit class
+        :param arms_number: (denoted as k) number of bandit's arms
+        :param context_dimension: (denoted as d) number of context features
+        :param confidence_level: (denoted as 𝑐) width of the LinUCB confidence bound
+        :param use_thompson_sampling: if True, use linear Thompson sampling instead of LinUCB
+        :param regularization: (denoted as 𝜆) ridge regularization, i.e. prior precision of every 𝜽(𝑎)
+        :param noise_std: (denoted as σ) standard deviation of the reward noise, also used to scale Thompson samples
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for sampling
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.k = arms_number
+        self.d = context_dimension
+        self.confidence_level = confidence_level
+        self.use_thompson_sampling = use_thompson_sampling
+        self.regularization = regularization
+        self.noise_std = noise_std
+        self.rand = rand
+
+        # True parameters of each action (denoted as 𝜽_∗(𝑎)), shape (k, d)
+        self.true_parameters = None
+
+        # Inverse design matrix of each action (denoted as 𝑨(𝑎)⁻¹), shape (k, d, d)
+        self.covariance_inverse = None
+
+        # Cholesky factor of each 𝑨(𝑎)⁻¹ for Thompson sampling, shape (k, d, d)
+        self.covariance_factor = None
+
+        # Reward-weighted sum of contexts of each action (denoted as 𝒃(𝑎)), shape (k, d)
+        self.reward_context_sums = None
+
+        # Estimated parameters of each action (denoted as 𝜽̂(𝑎) = 𝑨(𝑎)⁻¹𝒃(𝑎)), shape (k, d)
+        self.estimated_parameters = None
+
+        # Number of times each action has been selected
+        self.action_selection_count = None
+
+        # Time steps (1 per context)
+        self.time = 0
+
+        # Contexts of the last act() call, and the optimal action for each of them
+        self.contexts = None
+        self.optimal_action = None
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def initialize(self):
+        # region Summary
+        """
+        Initialize action parameters
+        """
+        # endregion Summary
+
+        # region Body
+
+        # True parameters are drawn so that 𝒙ᵀ𝜽_∗(𝑎) has unit variance for standard normal contexts
+        self.true_parameters = self.rand.standard_normal((self.k, self.d)) / np.sqrt(self.d)
+
+        self.covariance_inverse = np.tile(np.eye(self.d) / self.regularization, (self.k, 1, 1))
+        self.covariance_factor = np.tile(np.eye(self.d) / np.sqrt(self.regularization), (self.k, 1, 1))
+        self.reward_context_sums = np.zeros((self.k, self.d))
+        self.estimated_parameters = np.zeros((self.k, self.d))
+        self.action_selection_count = np.zeros(self.k)
+        self.time = 0
+
+        self.contexts = None
+        self.optimal_action = None
+
+        # endregion Body
+
+    def draw_contexts(self, n=None):
+        # region Summary
+        """
+        Draw contexts from a standard normal distribution (for simulations)
+        :param n: Number of contexts (None for a single context)
+        :return: Context of shape (d,) or contexts of shape (n, d)
+        """
+        # endregion Summary
+
+        # region Body
+
+        return self.rand.standard_normal(self.d if n is None else (n, self.d))
+
+        # endregion Body
+
+    def argmax(self, scores):
+        # region Summary
+        """
+        Row-wise argmax that breaks ties randomly (see BatchedBandit.argmax), e.g. between all arms right after initialize()
+        :param scores: Scores of shape (n, k)
+        :return: Index of a maximal score for every row
+        """
+        # endregion Summary
+
+        # region Body
+
+        is_max = scores == np.max(scores, axis=1, keepdims=True)
+        action = np.argmax(scores, axis=1)
+
+        # Only rows with several maximal scores need random keys
+        tied = np.count_nonzero(is_max, axis=1) > 1
+        if np.any(tied):
+            keys = self.rand.random((np.count_nonzero(tied), self.k))
+            action[tied] = np.argmax(np.where(is_max[tied], keys, -1.), axis=1)
+
+        return action
+
+        # endregion Body
+
+    def act(self, contexts):
+        # region Summary
+        """
+        Get an action for every context in 1 vectorized call.
+        :param contexts: Context of shape (d,) or contexts of shape (n, d)
+        :return: Action or actions of shape (n,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        single = np.ndim(contexts) == 1
+        self.contexts = np.atleast_2d(contexts)
+
+        if self.use_thompson_sampling:
+            # Draw 𝜽̃(𝑎) ~ N(𝜽̂(𝑎), σ²𝑨(𝑎)⁻¹) independently for every context and action
+            noise = self.rand.standard_normal((len(self.contexts), self.k, self.d))
+            sampled_parameters = self.estimated_parameters + self.noise_std * np.einsum('kij,nkj->nki', self.covariance_factor, noise)
+            scores = np.einsum('nd,nkd->nk', self.contexts, sampled_parameters)
+
+        else:
+            # LinUCB: 𝒙ᵀ𝜽̂(𝑎) + 𝑐√(𝒙ᵀ𝑨(𝑎)⁻¹𝒙)
+            means = self.contexts @ self.estimated_parameters.T
+            widths = np.sqrt(np.einsum('nd,kde,ne->nk', self.contexts, self.covariance_inverse, self.contexts))
+            scores = means + self.confidence_level * widths
+
+        action = self.argmax(scores)
+
+        # Optimal actions for the given contexts, to measure % optimal action in simulations
+        self.optimal_action = np.argmax(self.contexts @ self.true_parameters.T, axis=1)
+
+        if single:
+            self.optimal_action = self.optimal_action[0]
+            return action[0]
+
+        return action
+
+        # endregion Body
+
+    def step(self, action, reward=None):
+        # region Summary
+        """
+        Update estimated parameters with the contexts of the last act() call.
+        :param action: Action or actions of shape (n,) selected for those contexts
+        :param reward: Observed reward(s). If None, rewards are drawn from the simulated environment: 𝒙ᵀ𝜽_∗(𝑎) + σ * N(0, 1)
+        :return: Reward or rewards of shape (n,)
+        """
+        # endregion Summary
+
+        # region Body
+
+        single = np.ndim(action) == 0
+        actions = np.atleast_1d(action)
+        contexts = self.contexts
+
+        if reward is None:
+            rewards = (np.einsum('nd,nd->n', contexts, self.true_parameters[actions])
+                       + self.noise_std * self.rand.standard_normal(len(actions)))
+        else:
+            rewards = np.atleast_1d(np.asarray(reward, dtype=float))
+
+        self.time += len(actions)
+
+        # Every arm gets 1 rank-m update with all of its contexts from this batch
+        for arm in np.unique(actions):
+            selected = actions == arm
+            arm_contexts = contexts[selected]
+            covariance_inverse = self.covariance_inverse[arm]
+
+            if len(arm_contexts) == 1:
+                # Sherman–Morrison: (𝑨 + 𝒙𝒙ᵀ)⁻¹ = 𝑨⁻¹ - 𝑨⁻¹𝒙𝒙ᵀ𝑨⁻¹ / (1 + 𝒙ᵀ𝑨⁻¹𝒙)
+                projected = covariance_inverse @ arm_contexts[0]
+                covariance_inverse -= np.outer(projected, projected) / (1 + arm_contexts[0] @ projected)
+
+            elif len(arm_contexts) <= self.d:
+                # Woodbury: (𝑨 + 𝑿ᵀ𝑿)⁻¹ = 𝑨⁻¹ - 𝑨⁻¹𝑿ᵀ(𝑰 + 𝑿𝑨⁻¹𝑿ᵀ)⁻¹𝑿𝑨⁻¹, an m×m solve for m ≤ d contexts
+                projected = covariance_inverse @ arm_contexts.T
+                gram = np.eye(len(arm_contexts)) + arm_contexts @ projected
+                covariance_inverse -= projected @ np.linalg.solve(gram, projected.T)
+
+            else:
+                # More contexts than features: (𝑨 + 𝑿ᵀ𝑿)⁻¹ = (𝑰 + 𝑨⁻¹𝑿ᵀ𝑿)⁻¹𝑨⁻¹, a d×d solve whatever the batch size
+                covariance_inverse = np.linalg.solve(np.eye(self.d) + covariance_inverse @ (arm_contexts.T @ arm_contexts),
+                                                     covariance_inverse)
+
+            # Keep 𝑨⁻¹ exactly symmetric so its Cholesky factor stays well defined
+            covariance_inverse = (covariance_inverse + covariance_inverse.T) / 2
+            self.covariance_inverse[arm] = covariance_inverse
+
+            self.reward_context_sums[arm] += rewards[selected] @ arm_contexts
+            self.estimated_parameters[arm] = covariance_inverse @ self.reward_context_sums[arm]
+            self.action_selection_count[arm] += len(arm_contexts)
+
+            if self.use_thompson_sampling:
+                self.covariance_factor[arm] = np.linalg.cholesky(covariance_inverse)
+
+        return rewards[0] if single else rewards
+
+        # endregion Body
+
+    # endregion Functions
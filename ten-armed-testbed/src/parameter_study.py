@@ -0,0 +1,121 @@
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.batched_bandit import BatchedBandit
+
+# region Helpers
+
+def parameter_grid(**parameters):
+    # region Summary
+    """
+    Expand lists of Bandit constructor parameters into every combination of them
+    Example: parameter_grid(epsilon=[0, 0.1], use_sample_averages=[True]) -> [{epsilon: 0, ...}, {epsilon: 0.1, ...}]
+    :param parameters: For every constructor parameter, a list of its values
+    :return: List of Bandit constructor kwargs
+    """
+    # endregion Summary
+
+    # region Body
+
+    names = list(parameters)
+
+    return [dict(zip(names, values)) for values in itertools.product(*parameters.values())]
+
+    # endregion Body
+
+def run_shard(args):
+    # region Summary
+    """
+    Simulate a chunk of runs for one configuration and write its per-time-step sums into the shared memory
+    :param args: Tuple of (shared memory name, sums shape, shard index, bandit kwargs, runs, times, seed sequence)
+    """
+    # endregion Summary
+
+    # region Body
+
+    memory_name, shape, shard_index, config, runs, times, seed_sequence = args
+
+    # Every shard draws from its own generator, so results don't depend on which worker runs it
+    bandit = BatchedBandit(rand=np.random.default_rng(seed_sequence), **config)
+    bandit.initialize(runs)
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+
+    try:
+        # sums[0] holds reward sums, sums[1] holds optimal action counts
+        sums = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)[shard_index]
+
+        for time in range(times):
+            action = bandit.act()
+            sums[0, time] = np.sum(bandit.step(action))
+            sums[1, time] = np.count_nonzero(action == bandit.optimal_action)
+
+        # The view must be released before the shared memory can be closed
+        del sums
+
+    finally:
+        memory.close()
+
+    # endregion Body
+
+# endregion Helpers
+
+# region Functions
+
+def parameter_study(configs, runs, times, run_chunk=250, max_workers=None, seed=None):
+    # region Summary
+    """
+    Simulate every configuration on a process pool. Each (configuration, chunk of runs) shard is an independent job
+    seeded through SeedSequence.spawn, so results are reproducible for any number of workers.
+    :param configs: List of Bandit constructor kwargs (see parameter_grid)
+    :param runs: Number of runs per configuration
+    :param times: Number of times
+    :param run_chunk: Maximum number of runs per shard
+    :param max_workers: Number of worker processes (all CPUs if None)
+    :param seed: Seed of the root SeedSequence
+    :return: Optimal action count mean and reward mean, each of shape (len(configs), times)
+    """
+    # endregion Summary
+
+    # region Body
+
+    # Split the runs of every configuration into chunks
+    shards = [(config_index, min(run_chunk, runs - start))
+              for config_index in range(len(configs))
+              for start in range(0, runs, run_chunk)]
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(shards))
+
+    # Every shard writes its (2, times) partial sums into its own slot, so nothing large is pickled back
+    shape = (len(shards), 2, times)
+    memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(np.float64).itemsize)
+
+    try:
+        args_list = [(memory.name, shape, shard_index, configs[config_index], shard_runs, times, seed_sequences[shard_index])
+                     for shard_index, (config_index, shard_runs) in enumerate(shards)]
+
+        with ProcessPoolExecutor(max_workers=max_workers or mp.cpu_count()) as executor:
+            list(executor.map(run_shard, args_list))
+
+        # Reduce the partial sums in shard order, which keeps the result bit-identical
+        sums = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        totals = np.zeros((len(configs), 2, times))
+
+        for shard_index, (config_index, _) in enumerate(shards):
+            totals[config_index] += sums[shard_index]
+
+        del sums
+
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return totals[:, 1] / runs, totals[:, 0] / runs
+
+    # endregion Body
+
+# endregion Functions
@@ -0,0 +1,109 @@
+import numpy as np
+
+class RandomBuffer:
+    # region Summary
+    """
+    Buffered source of random numbers for per-step sampling.
+    Uniform and standard normal numbers are drawn in blocks and handed out one by one, which avoids the per-call overhead of
+    NumPy's samplers in hot loops. Calls with a size are forwarded to the underlying generator, so a RandomBuffer can be used
+    wherever np.random, a RandomState or a Generator is expected for random() and standard_normal().
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, rand=np.random, block_size=1024):
+        # region Summary
+        """
+        Constructor of RandomBuffer class
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator to draw blocks from
+        :param block_size: Number of values drawn per block
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.rand = rand
+        self.block_size = block_size
+
+        # Blocks are kept as Python lists, since reading 1 element of a list is much cheaper than of a NumPy array
+        self.uniforms = []
+        self.uniform_index = 0
+
+        self.normals = []
+        self.normal_index = 0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def random(self, size=None):
+        # region Summary
+        """
+        Uniform sample(s) from [0, 1)
+        :param size: Output shape (None for a single float from the buffer)
+        :return: Uniform sample(s)
+        """
+        # endregion Summary
+
+        # region Body
+
+        if size is not None:
+            return self.rand.random(size)
+
+        # Refill lazily when the block is used up
+        if self.uniform_index == len(self.uniforms):
+            self.uniforms = self.rand.random(self.block_size).tolist()
+            self.uniform_index = 0
+
+        value = self.uniforms[self.uniform_index]
+        self.uniform_index += 1
+
+        return value
+
+        # endregion Body
+
+    def standard_normal(self, size=None):
+        # region Summary
+        """
+        Sample(s) from a normal (Gaussian) distribution with μ=0 mean and σ=1 variance
+        :param size: Output shape (None for a single float from the buffer)
+        :return: Normal sample(s)
+        """
+        # endregion Summary
+
+        # region Body
+
+        if size is not None:
+            return self.rand.standard_normal(size)
+
+        # Refill lazily when the block is used up
+        if self.normal_index == len(self.normals):
+            self.normals = self.rand.standard_normal(self.block_size).tolist()
+            self.normal_index = 0
+
+        value = self.normals[self.normal_index]
+        self.normal_index += 1
+
+        return value
+
+        # endregion Body
+
+    def integer(self, high):
+        # region Summary
+        """
+        Uniform integer from [0, high), e.g. a random action or a random index among tied actions
+        :param high: Number of possible values
+        :return: Integer
+        """
+        # endregion Summary
+
+        # region Body
+
+        return int(self.random() * high)
+
+        # endregion Body
+
+    # endregion Functions
@@ -0,0 +1,129 @@
+import numpy as np
+from tqdm import trange
+
+from src.accumulators import RunningStatistics
+from src.batched_bandit import BatchedBandit
+
+def simulate(runs, times, bandits):
+    # region Summary
+    """
+    For any learning method, we can measure its performance and behavior as it improves with experience over 1000 time steps
+    when applied to 1 of the bandit problems. This makes up 1 run. Repeating this for 2000 independent runs, each with a different
+    bandit problem, we obtained measures of the learning algorithm’s average behavior.
+    Bandit problems are simulated run by run, BatchedBandit problems advance all runs together.
+    :param runs: Number of runs
+    :param times: Number of times
+    :param bandits: Bandit or BatchedBandit problems
+    :return: Optimal action count mean and reward mean
+    """
+    # endregion Summary
+
+    # region Body
+
+    # Prepare matrices filled with 0s for mean rewards and mean optimal action counts
+    mean_rewards = np.zeros((len(bandits), times))
+    mean_optimal_action_counts = np.zeros(mean_rewards.shape)
+
+    for i, bandit in enumerate(bandits):
+        if isinstance(bandit, BatchedBandit):
+            # initialize all runs at once
+            bandit.initialize(runs)
+
+            # for every time step
+            for time in range(times):
+                # select an action and get the reward for every run
+                action = bandit.act()
+                mean_rewards[i, time] = np.mean(bandit.step(action))
+
+                # share of runs that selected their optimal action
+                mean_optimal_action_counts[i, time] = np.mean(action == bandit.optimal_action)
+
+            continue
+
+        # Prepare matrices filled with 0s for rewards and optimal action counts of this bandit
+        rewards = np.zeros((runs, times))
+        optimal_action_counts = np.zeros(rewards.shape)
+
+        # for every run
+        for run in trange(runs):
+            # initialize bandit
+            bandit.initialize()
+
+            # for every time step
+            for time in range(times):
+                # select an action
+                action = bandit.act()
+
+                # get the reward
+                rewards[run, time] = bandit.step(action)
+
+                # if the selected action is optimal for bandit
+                if action == bandit.optimal_action:
+                    # change the corresponding 0 in the optimal action counts matrix to 1
+                    optimal_action_counts[run, time] = 1
+
+        mean_rewards[i] = rewards.mean(axis=0)
+        mean_optimal_action_counts[i] = optimal_action_counts.mean(axis=0)
+
+    return mean_optimal_action_counts, mean_rewards
+
+    # endregion Body
+
+def simulate_streaming(runs, times, bandits, reservoir_size=0):
+    # region Summary
+    """
+    Same experiment as simulate, but results are accumulated online instead of being stored for every run,
+    so memory is O(bandits × times) whatever the number of runs.
+    :param runs: Number of runs
+    :param times: Number of times
+    :param bandits: Bandit or BatchedBandit problems
+    :param reservoir_size: Number of samples kept per time step for quantile estimates (0 disables quantiles)
+    :return: For every bandit, RunningStatistics of optimal action counts and RunningStatistics of rewards
+    """
+    # endregion Summary
+
+    # region Body
+
+    optimal_action_statistics = [RunningStatistics(times, reservoir_size) for _ in bandits]
+    reward_statistics = [RunningStatistics(times, reservoir_size) for _ in bandits]
+
+    for i, bandit in enumerate(bandits):
+        if isinstance(bandit, BatchedBandit):
+            # initialize all runs at once
+            bandit.initialize(runs)
+
+            # for every time step
+            for time in range(times):
+                # select an action and get the reward for every run
+                action = bandit.act()
+                reward_statistics[i].update_step(time, bandit.step(action))
+                optimal_action_statistics[i].update_step(time, (action == bandit.optimal_action).astype(float))
+
+            continue
+
+        # Rewards and optimal action indicators of the current run only
+        rewards = np.zeros(times)
+        optimal_action_counts = np.zeros(times)
+
+        # for every run
+        for run in trange(runs):
+            # initialize bandit
+            bandit.initialize()
+
+            # for every time step
+            for time in range(times):
+                # select an action
+                action = bandit.act()
+
+                # get the reward
+                rewards[time] = bandit.step(action)
+
+                # 1 if the selected action is optimal for bandit, otherwise 0
+                optimal_action_counts[time] = action == bandit.optimal_action
+
+            reward_statistics[i].update(rewards)
+            optimal_action_statistics[i].update(optimal_action_counts)
+
+    return optimal_action_statistics, reward_statistics
+
+    # endregion Body
@@ -0,0 +1,252 @@
+import numpy as np
+
+class TournamentTree:
+    # region Summary
+    """
+    Max tournament tree over k values.
+    Every internal node stores the index of the winner among the leaves below it, so the argmax is read from the root in O(1)
+    and changing 1 value replays only the O(log k) matches on its path to the root.
+    Ties are broken by a random key per leaf, which is redrawn whenever the leaf changes.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, values, rand=np.random):
+        # region Summary
+        """
+        Constructor of TournamentTree class
+        :param values: Initial values
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for tie-breaking keys
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.rand = rand
+        self.k = len(values)
+
+        # Number of leaves, rounded up to a power of 2. Padding leaves never win.
+        self.size = 1 << max(self.k - 1, 0).bit_length()
+
+        # Python lists are used because single-element access is much cheaper than with NumPy arrays
+        self.values = np.concatenate([np.asarray(values, dtype=float), np.full(self.size - self.k, -np.inf)]).tolist()
+        self.keys = np.concatenate([rand.random(self.k), np.full(self.size - self.k, -1.)]).tolist()
+
+        # Winner of every node: node 1 is the root, nodes [size, 2 * size) are the leaves
+        self.winners = [0] * self.size + list(range(self.size))
+        for node in range(self.size - 1, 0, -1):
+            self.replay(node)
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def value(self, index):
+        # region Summary
+        """
+        Get the value of a leaf
+        :param index: Leaf index
+        :return: Value
+        """
+        # endregion Summary
+
+        # region Body
+
+        return self.values[index]
+
+        # endregion Body
+
+    def replay(self, node):
+        # region Summary
+        """
+        Replay the match between the winners of the children of given node
+        :param node: Internal node
+        """
+        # endregion Summary
+
+        # region Body
+
+        left = self.winners[2 * node]
+        right = self.winners[2 * node + 1]
+        left_value = self.value(left)
+        right_value = self.value(right)
+
+        if left_value > right_value or (left_value == right_value and self.keys[left] > self.keys[right]):
+            self.winners[node] = left
+        else:
+            self.winners[node] = right
+
+        # endregion Body
+
+    def update(self, index, value):
+        # region Summary
+        """
+        Change the value of a leaf and replay the matches on its path to the root
+        :param index: Leaf index
+        :param value: New value
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.values[index] = value
+        self.keys[index] = self.rand.random()
+
+        node = (self.size + index) >> 1
+        while node:
+            self.replay(node)
+            node >>= 1
+
+        # endregion Body
+
+    def argmax(self):
+        # region Summary
+        """
+        Get the index of the maximal value
+        :return: Index of the maximal value
+        """
+        # endregion Summary
+
+        # region Body
+
+        return self.winners[1]
+
+        # endregion Body
+
+    # endregion Functions
+
+class KineticTournamentTree(TournamentTree):
+    # region Summary
+    """
+    Kinetic max tournament tree over k linear functions 𝑣(𝑎) = intercept(𝑎) + 𝑔 * slope(𝑎) of a non-decreasing parameter 𝑔.
+    UCB estimates have this form with 𝑔 = 𝑐 * √ln(𝑡 + 1). Every internal node also stores the value of 𝑔 at which its winner
+    would lose (its certificate), so advancing 𝑔 only replays the matches whose certificates have expired.
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, intercepts, slopes, rand=np.random):
+        # region Summary
+        """
+        Constructor of KineticTournamentTree class
+        :param intercepts: Initial intercepts
+        :param slopes: Initial slopes
+        :param rand: np.random, an instance of np.random.RandomState or np.random.Generator for tie-breaking keys
+        """
+        # endregion Summary
+
+        # region Body
+
+        # Current value of the parameter 𝑔
+        self.parameter = 0.
+
+        size = 1 << max(len(intercepts) - 1, 0).bit_length()
+        self.slopes = np.concatenate([np.asarray(slopes, dtype=float), np.zeros(size - len(slopes))]).tolist()
+
+        # Value of 𝑔 at which the winner of a node loses its match (own) and the earliest such value in its subtree
+        self.failures = [np.inf] * (2 * size)
+        self.certificates = [np.inf] * (2 * size)
+
+        TournamentTree.__init__(self, intercepts, rand)
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def value(self, index):
+        # region Summary
+        """
+        Get the value of a leaf at the current parameter
+        :param index: Leaf index
+        :return: Value
+        """
+        # endregion Summary
+
+        # region Body
+
+        return self.values[index] + self.parameter * self.slopes[index]
+
+        # endregion Body
+
+    def replay(self, node):
+        # region Summary
+        """
+        Replay the match between the winners of the children of given node and renew its certificate
+        :param node: Internal node
+        """
+        # endregion Summary
+
+        # region Body
+
+        TournamentTree.replay(self, node)
+
+        winner = self.winners[node]
+        loser = self.winners[2 * node] + self.winners[2 * node + 1] - winner
+
+        # The loser overtakes the winner only if its value grows faster
+        slope_difference = self.slopes[loser] - self.slopes[winner]
+        if slope_difference > 0 and self.values[loser] > -np.inf:
+            # Never earlier than now, otherwise rounding could keep the certificate expired forever
+            failure = max((self.values[winner] - self.values[loser]) / slope_difference, self.parameter)
+        else:
+            failure = np.inf
+
+        self.failures[node] = failure
+        self.certificates[node] = min(failure, self.certificates[2 * node], self.certificates[2 * node + 1])
+
+        # endregion Body
+
+    def update(self, index, intercept, slope):
+        # region Summary
+        """
+        Change the function of a leaf and replay the matches on its path to the root
+        :param index: Leaf index
+        :param intercept: New intercept
+        :param slope: New slope
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.slopes[index] = slope
+        TournamentTree.update(self, index, intercept)
+
+        # endregion Body
+
+    def advance(self, parameter):
+        # region Summary
+        """
+        Move the parameter forward and replay every match whose winner has changed
+        :param parameter: New value of the parameter (must not decrease)
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.parameter = parameter
+
+        if self.certificates[1] >= parameter:
+            return
+
+        # Collect the expired nodes top-down, then replay them bottom-up so children are settled before their parents
+        expired = []
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            expired.append(node)
+            for child in (2 * node, 2 * node + 1):
+                if child < self.size and self.certificates[child] < parameter:
+                    stack.append(child)
+
+        for node in reversed(expired):
+            self.replay(node)
+
+        # endregion Body
+
+    # endregion Functions
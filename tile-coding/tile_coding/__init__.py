@@ -0,0 +1,56 @@
+import importlib
+
+# region Summary
+"""
+Tile coding utilities from R. Sutton (http://incompleteideas.net/tiles/tiles3.py-remove), shared by the experiments.
+Tiles can be indexed by an IHT (dict-backed), an ArrayIHT (open addressing over preallocated NumPy arrays)
+or by hashing only, when an integer size is passed instead of a table.
+Submodules are imported on first use, so e.g. `from tile_coding import IHT, tiles` doesn't import NumPy.
+"""
+# endregion Summary
+
+# region Exports
+
+# Module of every public name
+modules = dict(
+    IHT="tile_coding.iht",
+    ArrayIHT="tile_coding.array_iht",
+    hash_coords="tile_coding.tiles",
+    tiles="tile_coding.tiles",
+    tile_coordinates="tile_coding.batch",
+    hash_tuples="tile_coding.hashing",
+    tiles_batch="tile_coding.batch",
+)
+
+__all__ = list(modules)
+
+def __getattr__(name):
+    # region Summary
+    """
+    Import the module of a public name on first access (PEP 562)
+    :param name: Attribute name
+    :return: Attribute
+    """
+    # endregion Summary
+
+    # region Body
+
+    if name not in modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(modules[name])
+
+    # Bind every public name of the module, so later accesses don't go through __getattr__.
+    # Importing tile_coding.tiles also binds the package attribute tiles to that submodule, which this replaces with the function.
+    for public_name, module_name in modules.items():
+        if module_name == modules[name]:
+            globals()[public_name] = getattr(module, public_name)
+
+    return globals()[name]
+
+    # endregion Body
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+# endregion Exports
@@ -0,0 +1,341 @@
+import numpy as np
+
+from tile_coding.hashing import MASK_64, hash_rows, pack_rows, pack_tuple
+
+# region Constants
+
+# 2^64 / golden ratio, spreads the 64-bit keys over the slots (Fibonacci hashing)
+FIBONACCI_MULTIPLIER = 11400714819323198485
+
+# endregion Constants
+
+class ArrayIHT:
+    # region Summary
+    """
+    Index Hash Table backed by preallocated NumPy arrays instead of a dict.
+    Coordinates are packed into a 64-bit key (see pack_rows), which is stored in an open-addressing table with linear probing.
+    Indices are handed out in insertion order like in IHT, and when the table is full, new coordinates get hash(coordinates) % size
+    like in IHT. Distinct coordinates with equal keys would share an index, which happens with probability ~ n² / 2^65 for n coordinates.
+    Memory is fixed at construction (12 bytes per slot for up to 2^31 indices). Instead of printing when it's full, the table counts
+    overflows, collisions, probes and occupancy, which are reported by statistics().
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, size_val, load_factor=0.5):
+        # region Summary
+        """
+        Constructor of ArrayIHT class
+        :param size_val: Maximal number of indices
+        :param load_factor: Maximal share of occupied slots, the number of slots is the next power of 2 above size_val / load_factor
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.size = size_val
+        self.overfull_count = 0
+
+        # Number of slots (a power of 2, at least 2) and the shift that maps a multiplied hash to a slot
+        self.capacity = 1 << max(int(np.ceil(size_val / load_factor)) - 1, 1).bit_length()
+        self.shift = 64 - (self.capacity.bit_length() - 1)
+
+        # Packed coordinates (64-bit keys) and their indices, -1 marks an empty slot
+        self.keys = np.zeros(self.capacity, dtype=np.uint64)
+        self.values = np.full(self.capacity, -1, dtype=np.int32 if size_val < 2 ** 31 else np.int64)
+
+        # Number of stored coordinates
+        self.number = 0
+
+        # Counters reported by statistics()
+        self.lookups = 0
+        self.insertions = 0
+        self.probes = 0
+        self.collisions = 0
+        self.longest_probe = 0
+
+        # endregion Body
+
+    # endregion Constructor
+
+    # region Functions
+
+    def count(self):
+        return self.number
+
+    def full(self):
+        return self.number >= self.size
+
+    def slots(self, keys):
+        # region Summary
+        """
+        Get the first slot probed for every key
+        :param keys: Keys (uint64)
+        :return: Slots (int64)
+        """
+        # endregion Summary
+
+        # region Body
+
+        # uint64 multiplication wraps around, the top bits are the slot
+        return ((keys * np.uint64(FIBONACCI_MULTIPLIER)) >> np.uint64(self.shift)).astype(np.int64)
+
+        # endregion Body
+
+    def get_index(self, obj, read_only=False):
+        # region Summary
+        """
+        Get the index of 1 coordinates tuple, inserting it if it's new
+        :param obj: Coordinates tuple
+        :param read_only: Read-only?
+        :return: Index (None for unknown coordinates if read-only)
+        """
+        # endregion Summary
+
+        # region Body
+
+        key = pack_tuple(obj)
+        slot = ((key * FIBONACCI_MULTIPLIER) & MASK_64) >> self.shift
+
+        self.lookups += 1
+        probes = 0
+
+        # Probe until the key or an empty slot is found, or every slot was inspected (a full table with load_factor=1)
+        while True:
+            probes += 1
+            value = int(self.values[slot])
+
+            if value < 0 or int(self.keys[slot]) == key:
+                break
+
+            if probes == self.capacity:
+                value = -1
+                break
+
+            # The slot holds another key
+            self.collisions += 1
+            slot = (slot + 1) & (self.capacity - 1)
+
+        self.probes += probes
+        self.longest_probe = max(self.longest_probe, probes)
+
+        if value >= 0:
+            return value
+
+        if read_only:
+            return None
+
+        if self.number >= self.size:
+            self.overfull_count += 1
+            return hash(obj) % self.size
+
+        self.keys[slot] = key
+        self.values[slot] = self.number
+        self.number += 1
+        self.insertions += 1
+
+        return self.number - 1
+
+        # endregion Body
+
+    def record(self, probes):
+        # region Summary
+        """
+        Count lookups with given probe lengths. Every inspected slot but the last held another key, so it counts as a collision (as in get_index).
+        :param probes: Number of slots inspected by every lookup
+        """
+        # endregion Summary
+
+        # region Body
+
+        if len(probes) == 0:
+            return
+
+        self.lookups += len(probes)
+        self.probes += int(probes.sum())
+        self.collisions += int(probes.sum()) - len(probes)
+        self.longest_probe = max(self.longest_probe, int(probes.max()))
+
+        # endregion Body
+
+    def lookup(self, keys):
+        # region Summary
+        """
+        Find the indices of keys, all keys probe their next slot together. Nothing is counted (see record).
+        :param keys: Keys (uint64)
+        :return: Indices (-1 for unknown keys), and the number of slots inspected for every key
+        """
+        # endregion Summary
+
+        # region Body
+
+        indices = np.full(len(keys), -1, dtype=np.int64)
+        probes = np.zeros(len(keys), dtype=np.int64)
+        slots = self.slots(keys)
+        pending = np.arange(len(keys))
+
+        while len(pending):
+            probes[pending] += 1
+
+            pending_slots = slots[pending]
+            values = self.values[pending_slots]
+
+            # A key is found in an occupied slot with the same key, and is unknown once an empty slot is reached
+            found = (values >= 0) & (self.keys[pending_slots] == keys[pending])
+            indices[pending[found]] = values[found]
+
+            # Keys stop after every slot was inspected (a full table with load_factor=1)
+            occupied = (values >= 0) & ~found & (probes[pending] < self.capacity)
+
+            pending = pending[occupied]
+            slots[pending] = (pending_slots[occupied] + 1) & (self.capacity - 1)
+
+        return indices, probes
+
+        # endregion Body
+
+    def insert(self, keys, values):
+        # region Summary
+        """
+        Insert unique keys that aren't in the table yet, 1 after another in the given order,
+        so every key gets the same slot as if get_index inserted it
+        :param keys: Unique new keys (uint64)
+        :param values: Their indices
+        :return: Number of slots inspected to insert every key
+        """
+        # endregion Summary
+
+        # region Body
+
+        probes = np.zeros(len(keys), dtype=np.int64)
+
+        for position, slot in enumerate(self.slots(keys).tolist()):
+            # Probe until an empty slot is found
+            probes[position] = 1
+            while self.values[slot] >= 0:
+                probes[position] += 1
+                slot = (slot + 1) & (self.capacity - 1)
+
+            self.keys[slot] = keys[position]
+            self.values[slot] = values[position]
+
+        self.insertions += len(keys)
+
+        return probes
+
+        # endregion Body
+
+    def get_indices(self, coordinates, read_only=False):
+        # region Summary
+        """
+        Get the indices of many coordinates with array operations. New coordinates are inserted in order of first appearance,
+        so indices, slots and statistics are the same as calling get_index for every row in order.
+        :param coordinates: Integer coordinates of shape (..., length)
+        :param read_only: Read-only?
+        :return: Indices of shape (...) (-1 for unknown coordinates if read-only)
+        """
+        # endregion Summary
+
+        # region Body
+
+        coordinates = np.asarray(coordinates, dtype=np.int64)
+        packed = pack_rows(coordinates)
+        shape = packed.shape
+        packed = packed.ravel()
+
+        # Known coordinates are found without sorting anything
+        indices, probes = self.lookup(packed)
+
+        missing_rows = np.flatnonzero(indices < 0)
+
+        if not read_only and len(missing_rows):
+            # Unique new keys in order of first appearance
+            unique_keys, first, inverse = np.unique(packed[missing_rows], return_index=True, return_inverse=True)
+            order = np.argsort(first, kind="stable")
+            ranks = np.empty_like(order)
+            ranks[order] = np.arange(len(order))
+            keys = unique_keys[order]
+            positions = ranks[inverse.ravel()]
+            new_indices = np.empty(len(keys), dtype=np.int64)
+            new_probes = np.empty(len(keys), dtype=np.int64)
+
+            # New keys get the next indices while there is room, the rest collide like in IHT
+            room = max(self.size - self.number, 0)
+            new, overflow = slice(0, room), slice(room, len(keys))
+
+            new_indices[new] = self.number + np.arange(len(keys[new]))
+            new_probes[new] = self.insert(keys[new], new_indices[new])
+            self.number += len(keys[new])
+
+            if len(keys[overflow]):
+                self.overfull_count += int(np.count_nonzero(positions >= room))
+
+                # The row of the first appearance of every overflowing key gives its tuple hash
+                rows = missing_rows[first[order][overflow]]
+                new_indices[overflow] = hash_rows(coordinates.reshape(-1, coordinates.shape[-1])[rows]) % self.size
+
+                # Overflowing keys come after the last insertion, so they probe the final table
+                new_probes[overflow] = self.lookup(keys[overflow])[1]
+
+            # A key is found as far from its first slot as it was inserted, so repeated rows of a new key probe as long as its insertion
+            indices[missing_rows] = new_indices[positions]
+            probes[missing_rows] = new_probes[positions]
+
+        self.record(probes)
+
+        return indices.reshape(shape)
+
+        # endregion Body
+
+    def statistics(self):
+        # region Summary
+        """
+        Get the counters of the table
+        :return: Dict of counters:
+                 count, size, capacity - stored coordinates, maximal indices and slots
+                 occupancy - share of occupied slots, fill - share of indices handed out
+                 lookups, insertions - keys looked up and inserted
+                 probes, mean_probe_length, longest_probe - slots inspected by lookups, on average and at most for 1 key
+                 collisions - inspected slots that held another key
+                 overflows - coordinates that got a colliding hash index because the table was full
+                 memory - bytes of the key and index arrays
+        """
+        # endregion Summary
+
+        # region Body
+
+        return dict(count=self.number,
+                    size=self.size,
+                    capacity=self.capacity,
+                    occupancy=self.number / self.capacity,
+                    fill=self.number / self.size,
+                    lookups=self.lookups,
+                    insertions=self.insertions,
+                    probes=self.probes,
+                    mean_probe_length=self.probes / self.lookups if self.lookups else 0.,
+                    longest_probe=self.longest_probe,
+                    collisions=self.collisions,
+                    overflows=self.overfull_count,
+                    memory=self.keys.nbytes + self.values.nbytes)
+
+        # endregion Body
+
+    def reset_statistics(self):
+        # region Summary
+        """
+        Reset the lookup, insertion, probe and collision counters (e.g. between training and evaluation)
+        """
+        # endregion Summary
+
+        # region Body
+
+        self.lookups = 0
+        self.insertions = 0
+        self.probes = 0
+        self.collisions = 0
+        self.longest_probe = 0
+
+        # endregion Body
+
+    # endregion Functions
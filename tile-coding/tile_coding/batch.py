@@ -0,0 +1,81 @@
+import numpy as np
+
+from tile_coding.array_iht import ArrayIHT
+from tile_coding.hashing import hash_rows
+from tile_coding.iht import IHT
+
+# region Functions
+
+def tile_coordinates(num_tilings, floats, ints=None):
+    # region Summary
+    """
+    Coordinates of all tilings for a batch of inputs, computed in 1 array operation.
+    Row i, tiling t holds the same coordinates that tiles() builds for floats[i] and ints[i] in tiling t.
+    :param num_tilings: Number of tilings
+    :param floats: Float variables of shape (n, number of floats)
+    :param ints: Integer variables of shape (n, number of ints) or (number of ints,) shared by all rows
+    :return: Coordinates of shape (n, num_tilings, 1 + number of floats + number of ints)
+    """
+    # endregion Summary
+
+    # region Body
+
+    floats = np.asarray(floats, dtype=float)
+    n, floats_number = floats.shape
+
+    q_floats = np.floor(floats * num_tilings).astype(np.int64)
+
+    # In tiling t the offset of float j is t * (1 + 2j), the same as b in tiles()
+    tilings = np.arange(num_tilings)
+    offsets = tilings[:, None] * (1 + 2 * np.arange(floats_number))
+
+    coordinates = [np.broadcast_to(tilings[None, :, None], (n, num_tilings, 1)),
+                   (q_floats[:, None, :] + offsets[None]) // num_tilings]
+
+    if ints is not None and np.size(ints):
+        ints = np.asarray(ints, dtype=np.int64)
+        coordinates.append(np.broadcast_to(np.atleast_2d(ints)[:, None, :], (n, num_tilings, ints.shape[-1])))
+
+    return np.concatenate(coordinates, axis=2)
+
+    # endregion Body
+
+def tiles_batch(iht_or_size, num_tilings, floats, ints=None, read_only=False):
+    # region Summary
+    """
+    Vectorized tiles() for a batch of inputs. Returns the same indices as calling tiles() row by row:
+    with an IHT, new coordinates are inserted in the same order (row by row, tiling by tiling), so learned weights stay valid.
+    :param iht_or_size: Either an IHT or ArrayIHT of a given size, or an integer "size" (range of the indices from 0)
+    :param num_tilings: Number of tilings (see tiles)
+    :param floats: Float variables of shape (n, number of floats)
+    :param ints: Integer variables of shape (n, number of ints) or (number of ints,) shared by all rows
+    :param read_only: Read-only?
+    :return: Tile indices of shape (n, num_tilings) (for unknown coordinates of a read-only table: None in an object array with IHT, -1 with ArrayIHT)
+    """
+    # endregion Summary
+
+    # region Body
+
+    coordinates = tile_coordinates(num_tilings, floats, ints)
+
+    if isinstance(iht_or_size, ArrayIHT):
+        return iht_or_size.get_indices(coordinates, read_only)
+
+    if isinstance(iht_or_size, IHT):
+        # Coordinates are turned into tuples of Python ints, which are the same dictionary keys that tiles() uses
+        indices = iht_or_size.get_indices(coordinates.reshape(-1, coordinates.shape[-1]).tolist(), read_only)
+
+        if read_only and None in indices:
+            return np.array(indices, dtype=object).reshape(coordinates.shape[:2])
+
+        return np.array(indices, dtype=np.int64).reshape(coordinates.shape[:2])
+
+    if isinstance(iht_or_size, int):
+        return hash_rows(coordinates) % iht_or_size
+
+    if iht_or_size is None:
+        return coordinates
+
+    # endregion Body
+
+# endregion Functions
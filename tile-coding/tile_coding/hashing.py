@@ -0,0 +1,130 @@
+import sys
+
+import numpy as np
+
+# region Constants
+
+# Primes of CPython's tuple hash (Objects/tupleobject.c), used to hash coordinates in bulk
+XXPRIME_1 = np.uint64(11400714785074694791)
+XXPRIME_2 = np.uint64(14029467366897019727)
+XXPRIME_5 = np.uint64(2870177450012600261)
+
+# Mask of 64-bit unsigned integers
+MASK_64 = (1 << 64) - 1
+
+# The tuple hash can be reproduced with NumPy on 64-bit CPython 3.8+, otherwise hash() is called for every tuple
+TUPLE_HASH_IS_REPRODUCIBLE = sys.implementation.name == "cpython" and sys.version_info >= (3, 8) and sys.hash_info.width == 64
+
+# endregion Constants
+
+# region Functions
+
+def mix_lanes(lanes):
+    # region Summary
+    """
+    Mix every row of 64-bit lanes into 1 64-bit value, the same way as CPython 3.8+ hashes tuples (xxHash-based)
+    :param lanes: Lanes of shape (..., length) as uint64
+    :return: Mixed values of shape (...) as uint64
+    """
+    # endregion Summary
+
+    # region Body
+
+    accumulator = np.full(lanes.shape[:-1], XXPRIME_5, dtype=np.uint64)
+
+    # uint64 arithmetic wraps around like the C implementation
+    for i in range(lanes.shape[-1]):
+        accumulator += lanes[..., i] * XXPRIME_2
+        accumulator = (accumulator << np.uint64(31)) | (accumulator >> np.uint64(33))
+        accumulator *= XXPRIME_1
+
+    accumulator += np.uint64(lanes.shape[-1] ^ (int(XXPRIME_5) ^ 3527539))
+
+    return accumulator
+
+    # endregion Body
+
+def hash_tuples(coordinates):
+    # region Summary
+    """
+    Reproduce hash(tuple(c)) for every row c of integer coordinates with NumPy (CPython 3.8+, 64-bit builds).
+    Coordinates must be smaller than 2^61 - 1 in absolute value, which holds for any tile coordinate.
+    :param coordinates: Integer coordinates of shape (..., length)
+    :return: Hashes of shape (...) as int64
+    """
+    # endregion Summary
+
+    # region Body
+
+    coordinates = np.asarray(coordinates, dtype=np.int64)
+
+    # hash(i) == i for small ints, except hash(-1) == -2
+    accumulator = mix_lanes(np.where(coordinates == -1, -2, coordinates).view(np.uint64))
+
+    # -1 is reserved for errors in C, so CPython replaces it
+    accumulator[accumulator == np.uint64(2 ** 64 - 1)] = np.uint64(1546275796)
+
+    return accumulator.view(np.int64)
+
+    # endregion Body
+
+def pack_rows(coordinates):
+    # region Summary
+    """
+    Pack every row of integer coordinates into a 64-bit key. The tuple hash can't be used as a key,
+    since hash(-1) == hash(-2) makes e.g. the coordinates of actions -1 and -2 collide, so the raw values are mixed instead.
+    :param coordinates: Integer coordinates of shape (..., length)
+    :return: Keys of shape (...) as uint64
+    """
+    # endregion Summary
+
+    # region Body
+
+    return mix_lanes(np.asarray(coordinates, dtype=np.int64).view(np.uint64))
+
+    # endregion Body
+
+def pack_tuple(coordinates):
+    # region Summary
+    """
+    Pack 1 coordinates tuple into the same 64-bit key as pack_rows, with Python ints
+    :param coordinates: Integer coordinates
+    :return: Key
+    """
+    # endregion Summary
+
+    # region Body
+
+    accumulator = int(XXPRIME_5)
+
+    for coordinate in coordinates:
+        accumulator = (accumulator + (int(coordinate) & MASK_64) * int(XXPRIME_2)) & MASK_64
+        accumulator = ((accumulator << 31) | (accumulator >> 33)) & MASK_64
+        accumulator = (accumulator * int(XXPRIME_1)) & MASK_64
+
+    return (accumulator + (len(coordinates) ^ (int(XXPRIME_5) ^ 3527539))) & MASK_64
+
+    # endregion Body
+
+def hash_rows(coordinates):
+    # region Summary
+    """
+    hash(tuple(c)) for every row c of integer coordinates, with NumPy where the tuple hash can be reproduced
+    :param coordinates: Integer coordinates of shape (..., length)
+    :return: Hashes of shape (...) as int64
+    """
+    # endregion Summary
+
+    # region Body
+
+    if TUPLE_HASH_IS_REPRODUCIBLE:
+        return hash_tuples(coordinates)
+
+    coordinates = np.asarray(coordinates, dtype=np.int64)
+
+    return np.array([hash(tuple(c)) for c in coordinates.reshape(-1, coordinates.shape[-1]).tolist()],
+                    dtype=np.int64).reshape(coordinates.shape[:-1])
+
+    # endregion Body
+
+# endregion Functions
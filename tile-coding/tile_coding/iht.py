@@ -0,0 +1,57 @@
+class IHT:
+    # region Summary
+    """
+    Index Hash Table - a structure to handle collisions
+    """
+    # endregion Summary
+
+    # region Constructor
+
+    def __init__(self, size_val):
+        self.size = size_val
+        self.overfull_count = 0
+        self.dictionary = {}
+
+    # endregion Constructor
+
+    # region Functions
+
+    def count(self):
+        return len(self.dictionary)
+
+    def full(self):
+        return len(self.dictionary) >= self.size
+
+    def get_index(self, obj, read_only=False):
+        d = self.dictionary
+        if obj in d:
+            return d[obj]
+        elif read_only:
+            return None
+        size = self.size
+        count = self.count()
+        if count >= size:
+            if self.overfull_count == 0: print('IHT full, starting to allow collisions')
+            self.overfull_count += 1
+            return hash(obj) % self.size
+        else:
+            d[obj] = count
+            return count
+
+    def get_indices(self, coordinates, read_only=False):
+        # region Summary
+        """
+        Get the indices of many coordinates, in order
+        :param coordinates: Iterable of coordinates (sequences of ints)
+        :param read_only: Read-only?
+        :return: List of indices (None for unknown coordinates if read-only)
+        """
+        # endregion Summary
+
+        # region Body
+
+        return [self.get_index(tuple(c), read_only) for c in coordinates]
+
+        # endregion Body
+
+    # endregion Functions
@@ -3,53 +3,10 @@ from math import floor
 # region Summary
 """
 Following are some utilities for tile coding from R. Sutton.
-To make each file self-contained, they were copied from http://incompleteideas.net/tiles/tiles3.py-remove with some naming convention changes.
+They were copied from http://incompleteideas.net/tiles/tiles3.py-remove with some naming convention changes.
 """
 # endregion Summary
 
-class IHT:
-    # region Summary
-    """
-    Index Hash Table - a structure to handle collisions
-    """
-    # endregion Summary
-
-    # region Constructor
-
-    def __init__(self, size_val):
-        self.size = size_val
-        self.overfull_count = 0
-        self.dictionary = {}
-
-    # endregion Constructor
-
-    # region Functions
-
-    def count(self):
-        return len(self.dictionary)
-
-    def full(self):
-        return len(self.dictionary) >= self.size
-
-    def get_index(self, obj, read_only=False):
-        d = self.dictionary
-        if obj in d:
-            return d[obj]
-        elif read_only:
-            return None
-        size = self.size
-        count = self.count()
-        if count >= size:
-            if self.overfull_count == 0: print('IHT full, starting to allow collisions')
-            self.overfull_count += 1
-            return hash(obj) % self.size
-        else:
-            d[obj] = count
-            return count
-
-    # endregion Functions
-
-
 # region Functions
 
 def hash_coords(coordinates, m, read_only=False):
@@ -57,7 +14,7 @@ def hash_coords(coordinates, m, read_only=False):
     """
     Hash coordinates.
     :param coordinates: Coordinates
-    :param m: Either an IHT of a given size, or an integer "size" (range of the indices from 0)
+    :param m: Either an IHT or ArrayIHT of a given size, or an integer "size" (range of the indices from 0)
     :param read_only: Read-only?
     :return: Hash coordinates
     """
@@ -65,22 +22,22 @@ def hash_coords(coordinates, m, read_only=False):
 
     # region Body
 
-    if isinstance(m, IHT):
-        return m.get_index(tuple(coordinates), read_only)
-
     if isinstance(m, int):
         return hash(tuple(coordinates)) % m
 
     if m is None:
         return coordinates
 
+    # IHT or ArrayIHT
+    return m.get_index(tuple(coordinates), read_only)
+
     # endregion Body
 
 def tiles(iht_or_size, num_tilings, floats, ints=None, read_only=False):
     # region Summary
     """
     Maps floating and integer variables to a list of tiles
-    :param iht_or_size: Either an IHT of a given size, or an integer "size" (range of the indices from 0)
+    :param iht_or_size: Either an IHT or ArrayIHT of a given size, or an integer "size" (range of the indices from 0)
     :param num_tilings: Should be a power of 2. To make the offsetting work properly,
                         it should also be greater than or equal to 4 times the number of floats.
     :param floats: The float variables will be gridded at unit intervals,